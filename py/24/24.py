@@ -1,6 +1,7 @@
-import fractions
-import operator
-import itertools
+import canon
+import rational
+import reach
+import tables
 
 DIGITS = {
     0: "0",
@@ -15,32 +16,16 @@ DIGITS = {
     9: "9",
 }
 OPERATIONS = {
-    "+": operator.add, 
-    "-": operator.sub, 
-    "*": operator.mul, 
-    "/": fractions.Fraction
+    "+": rational.add,
+    "-": rational.sub,
+    "*": rational.mul,
+    "/": rational.div
 }
 N_DIGITS = 4
 RESULT = 24
-
-def construct(digits: "tuple[int]", ops: "tuple[str]", order: "tuple[int]"):
-    refs = [*range(len(digits))]
-    vals = [*digits]
-
-    for i in order:
-        ai, bi = refs[i], refs[i + 1]
-
-        vals[ai:bi + 1] = [{
-            "op": ops[i],
-            "args": [vals[ai], vals[bi]]
-        }]
-
-        merged = min(ai, bi)
-        # two values got merged into 1, so value positions should be decremented
-        for j, r in enumerate(refs):
-            if r > merged: refs[j] -= 1
-    
-    return vals[0]
+ORDERED = True # if False, digits can be rearranged
+BATCH = False # evaluate all hands at once with numpy (see batch.py)
+PROGRESS = True # print hands/s, ETA and the slowest hands, and log every hand's timing to 24.times.jsonl
 
 def eval_tree(tree):
     if isinstance(tree, dict): 
@@ -68,25 +53,75 @@ def tree_str(tree, paren=False):
     
     return tree
 
+def valued_exprs(digits, lo, hi, memo=None):
+    """
+    (tree, value) for every expression over digits[lo..hi], built shape by shape
+    (one split point per node), so every tree is only built once. The runs below
+    the top are listed once each in memo ((lo, hi) -> [(tree, value)]), so every
+    subtree is evaluated once too. Trees that divide by 0 are left out.
+    """
+    if lo == hi:
+        yield digits[lo], digits[lo]
+        return
+    if memo is None: memo = {}
+
+    def run(lo, hi):
+        if (lo, hi) not in memo: memo[lo, hi] = [*valued_exprs(digits, lo, hi, memo)]
+        return memo[lo, hi]
+
+    for k in range(lo, hi):
+        lefts, rights = run(lo, k), run(k + 1, hi)
+        for left, a in lefts:
+            for right, b in rights:
+                for op, f in OPERATIONS.items():
+                    # a + (b + c) is (a + b) + c (same for *), which is already there
+                    if op in canon.COMMUTATIVE and isinstance(right, dict) and right["op"] == op: continue
+
+                    v = f(a, b)
+                    if v is not None: yield node(op, left, right), v
+
 def exprs_of(digits):
-    n_ops = N_DIGITS - 1
-    for ops in itertools.product(OPERATIONS, repeat=n_ops):
-        for order in itertools.permutations(range(n_ops), n_ops):
-            yield construct(digits, ops, order)
+    for tree, _ in valued_exprs(digits, 0, len(digits) - 1):
+        yield tree
 
 def test_digits(digits):
-    for tree in exprs_of(digits):
-        if eval_tree(tree) == RESULT:
+    for tree, v in valued_exprs(digits, 0, len(digits) - 1):
+        if v == RESULT:
             return tree
 
-with open("24.txt", "w") as f:
-    for digits in itertools.product(DIGITS, repeat=N_DIGITS):
-        tree = test_digits(digits)
+def unpack(tree):
+    if isinstance(tree, dict): return tree["op"], tree["args"]
 
-        n = "".join(DIGITS[d] for d in digits)
-        
-        if tree is not None:
-            f.write(f"{n}: {tree_str(tree)}")
-        else:
-            f.write(f"{n}: :(")
-        f.write("\n")
\ No newline at end of file
+def all_solutions(digits, ordered=ORDERED):
+    """Every solution for digits, once per canonical form (see canon.py)"""
+    perms = [digits] if ordered else tables.distinct_permutations(digits)
+    trees = (tree for perm in perms for tree, v in valued_exprs(perm, 0, len(perm) - 1) if v == RESULT)
+    return canon.unique(trees, unpack)
+
+def node(op, a, b):
+    return {"op": op, "args": [a, b]}
+
+def test_digits_dp(digits, ordered=True):
+    # same search space as test_digits, but shared subexpressions are only evaluated once.
+    # Same verdicts, but the expression is whichever combination made RESULT first, not the one in 24_digits.txt
+    return reach.solve(digits, OPERATIONS, RESULT, node, ordered)
+
+MEMOS = {ordered: reach.Memo(OPERATIONS, ordered) for ordered in (True, False)}
+
+def test_digits_memo(digits, ordered=True):
+    # like test_digits_dp, but sub-hands are shared with every other hand in the run.
+    # Ordered, it finds the same expressions as the ones in 24_digits.txt (see reach.Memo)
+    return MEMOS[ordered].solve(digits, RESULT, node)
+
+if __name__ == "__main__":
+    if BATCH:
+        import batch
+        batch.write_table("24.txt", DIGITS, N_DIGITS, node, eval_tree, RESULT, ordered=ORDERED, fmt=tree_str)
+    else:
+        tables.write_table(
+            "24.txt", test_digits_memo, DIGITS, N_DIGITS,
+            ordered=ORDERED, fmt=tree_str,
+            solve_any=lambda digits: test_digits_memo(digits, ordered=False),
+            progress=tables.Progress(log="24.times.jsonl") if PROGRESS else None
+        )
+        print("sub-hand memo:", MEMOS[ORDERED].stats())
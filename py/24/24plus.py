@@ -1,8 +1,11 @@
-from fractions import Fraction
+from collections import Counter
 import itertools
 import math
-import numbers
-import operator
+
+import canon
+import rational
+import reach
+import tables
 
 
 def estr(s):
@@ -10,11 +13,10 @@ def estr(s):
     return f"{s}"
 
 def is_integral(n):
-    return isinstance(n, numbers.Rational) and n.denominator == 1
+    return isinstance(n, rational.RATIONAL) and n.denominator == 1
 
 def rational_div(a, b):
-    if b == 0: return None
-    return Fraction(a, b)
+    return rational.div(a, b)
 
 def rational_pow(a, b):
     if a == 0 and b == 0: return None
@@ -22,42 +24,53 @@ def rational_pow(a, b):
     if a == 1: return 1
     if b == 0: return 1
 
-    if isinstance(a, numbers.Rational) and is_integral(b): 
-        if a < 100 and b < 100:
-            return pow(a, b)
+    if isinstance(a, rational.RATIONAL) and is_integral(b): 
+        if a < 100 and -100 < b < 100:
+            return rational.pow_bounded(a, b, pruned=COUNTS)
     return None
 
 def rational_log(base, x):
-    try:
-        l = round(math.log(x, base))
-        if base ** l == x: return l
-    except (ValueError, ZeroDivisionError):
-        return None
+    return rational.ilog(base, x)
 
 def rational_factorial(a):
-    if a < 0 or a > 100: return None
+    if not is_integral(a) or a < 0 or a > 100: return None
     return math.factorial(a)
 
+def rational_sqrt(a):
+    return rational.root(a, 2)
+
 BINOPS = {
-    "+": operator.add, 
-    "-": operator.sub, 
-    "*": operator.mul, 
+    "+": rational.add,
+    "-": rational.sub,
+    "*": rational.mul,
     "/": rational_div,
     "^": rational_pow,
     "log": rational_log
 }
+UNOPS = {
+    "!": rational_factorial,
+    "sqrt": rational_sqrt,
+    "neg": lambda a: -a
+}
 PRINT = {
     "log": lambda a, b: f"log_{a}({b})",
+    "!": lambda a: f"{estr(a)}!",
+    "sqrt": lambda a: f"sqrt({a})",
+    "neg": lambda a: f"-{estr(a)}",
 }
 
 class Expr:
-    op: str
-    args: list
+    """
+    A slotted node: just op and a tuple of args. Candidate trees are built and
+    dropped one at a time, so nothing is interned; a table that kept them all
+    alive to share subtrees cost far more memory than re-simplifying saves.
+    """
+    __slots__ = ("op", "args")
 
     def __new__(cls, op, args):
         o = object.__new__(cls)
         o.op = op
-        o.args = args
+        o.args = tuple(args)
         return o
     
 
@@ -85,20 +98,22 @@ class Expr:
     def __rpow__(self, other): return Expr("^", [other, self])
     
 class SExpr(Expr):
+    __slots__ = ()
+
     def __new__(cls, op, args):
         # simplify
         if op == "^":
             a, b = args
             
-            if isinstance(b, numbers.Rational):
+            if isinstance(b, rational.RATIONAL):
                 if isinstance(a, SExpr):
                     if a.op in ("*", "/"):
                         return cls(a.op, [cls("^", [arg, b]) for arg in a.args])
                     elif a.op in "^":
                         return cls(a.op, [a.args[0], a.args[1] * b])
         
-        if all(isinstance(a, numbers.Rational) for a in args) and op in BINOPS:
-            result = BINOPS[op](*args)
+        if all(isinstance(a, rational.RATIONAL) for a in args) and (op in BINOPS or op in UNOPS):
+            result = (BINOPS[op] if len(args) == 2 else UNOPS[op])(*args)
             if result is not None:
                 return result
         
@@ -107,6 +122,7 @@ class SExpr(Expr):
     @classmethod
     def simplify(cls, e):
         if isinstance(e, Expr) and not isinstance(e, cls):
+            COUNTS["simplify"] += 1
             return cls(e.op, [cls.simplify(a) for a in e.args])
         return e
     
@@ -122,8 +138,15 @@ DIGITS = {
     8: "8",
     9: "9",
 }
+# DIGITS = tables.DECK_JQK
 N_DIGITS = 4
 RESULT = 24
+ORDERED = True # if False, digits can be rearranged
+PROGRESS = True # print hands/s, ETA and the slowest hands, and log every hand's timing to 24.times.jsonl
+
+COUNTS = Counter() # expressions tried, Expr nodes simplified and powers over rational.BIT_BUDGET, per hand in the timing log
+BATCH = False # evaluate all hands at once with numpy (see batch.py)
+UNARY_DEPTH = 0 # if > 0, unary ops (UNOPS) can be nested this deep on any subexpression (see reach.close)
 
 def construct(digits: "tuple[int]", ops: "tuple[str]", order: "tuple[int]") -> Expr:
     refs = [*range(len(digits))]
@@ -152,18 +175,31 @@ def exprs_of(digits):
 
 def test_digits(digits):
     for tree in exprs_of(digits):
+        COUNTS["exprs"] += 1
         if SExpr.simplify(tree) == RESULT:
             return tree
 
-with open("24.txt", "w") as f:
-    for digits in itertools.product(DIGITS, repeat=N_DIGITS):
-        tree = test_digits(digits)
-
-        n = "".join(DIGITS[d] for d in digits)
-        
-        if tree is not None:
-            f.write(f"{n}: {tree}")
-        else:
-            f.write(f"{n}: :(")
-        f.write("\n")
-        f.flush()
\ No newline at end of file
+def unpack(e):
+    if isinstance(e, Expr): return e.op, e.args
+
+def all_solutions(digits, ordered=ORDERED):
+    """Every solution for digits, once per canonical form (see canon.py)"""
+    perms = [digits] if ordered else tables.distinct_permutations(digits)
+    trees = (tree for perm in perms for tree in exprs_of(perm) if SExpr.simplify(tree) == RESULT)
+    return canon.unique(trees, unpack)
+
+def node(op, *args):
+    return Expr(op, args)
+
+def test_digits_unary(digits):
+    # exprs_of would need every unary placement in every tree, the reachable-value tables only close each sub-hand's values
+    return reach.solve(digits, BINOPS, RESULT, node, ORDERED, UNOPS, UNARY_DEPTH)
+
+if __name__ == "__main__":
+    if BATCH:
+        import batch
+        batch.write_table("24.txt", DIGITS, N_DIGITS, node, SExpr.simplify, RESULT, batch.FLOAT_OPS_PLUS, ORDERED)
+    else:
+        progress = tables.Progress(log="24.times.jsonl") if PROGRESS else None
+        test = test_digits_unary if UNARY_DEPTH > 0 else test_digits
+        tables.write_table_parallel("24.txt", test, DIGITS, N_DIGITS, ordered=ORDERED, progress=progress)
@@ -1,8 +1,10 @@
-from fractions import Fraction
+from collections import Counter
 import itertools
 import math
-import numbers
-import operator
+
+import canon
+import rational
+import tables
 
 
 def estr(s):
@@ -10,11 +12,10 @@ def estr(s):
     return f"{s}"
 
 def is_integral(n):
-    return isinstance(n, numbers.Rational) and n.denominator == 1
+    return isinstance(n, rational.RATIONAL) and n.denominator == 1
 
 def rational_div(a, b):
-    if b == 0: return None
-    return Fraction(a, b)
+    return rational.div(a, b)
 
 def rational_pow(a, b):
     if a == 0 and b == 0: return None
@@ -22,26 +23,27 @@ def rational_pow(a, b):
     if a == 1: return 1
     if b == 0: return 1
 
-    if isinstance(a, numbers.Rational) and is_integral(b): 
-        if a < 100 and b < 100:
-            return pow(a, b)
+    if isinstance(a, rational.RATIONAL) and is_integral(b): 
+        if a < 100 and -100 < b < 100:
+            return rational.pow_bounded(a, b, pruned=COUNTS)
     return None
 
 def rational_log(base, x):
-    try:
-        l = round(math.log(x, base))
-        if base ** l == x: return l
-    except (ValueError, ZeroDivisionError):
-        return None
+    return rational.ilog(base, x)
+
+def rational_root(x, k):
+    # the X with X ^ k == x (see rational_pow), if k is odd or not integral
+    if x == 0 or x == 1: return x
+    if is_integral(k): return rational.root(x, k)
 
 def rational_factorial(a):
     if a < 0 or a > 100: return None
     return math.factorial(a)
 
 BINOPS = {
-    "+": operator.add, 
-    "-": operator.sub, 
-    "*": operator.mul, 
+    "+": rational.add,
+    "-": rational.sub,
+    "*": rational.mul,
     "/": rational_div,
     "^": rational_pow,
     "log": rational_log
@@ -71,9 +73,9 @@ B_INVERSES = {
         # X / a = c, X = c * a
         "/":   lambda a, c: c * a,
         # X ^ a = c, X = c ^ (1/a)
-        "^":   lambda a, c: rational_pow(c, rational_div(1, a)),
+        "^":   lambda a, c: rational_root(c, a),
         # log_X(a) = c, X = a ^ (1/c)
-        "log": lambda a, c: rational_pow(a, rational_div(1, c))
+        "log": lambda a, c: rational_root(a, c)
     },
 }
 
@@ -82,13 +84,17 @@ PRINT = {
 }
 
 class Expr:
-    op: str
-    args: list
+    """
+    A slotted node: just op and a tuple of args. Candidate trees are built and
+    dropped one at a time, so nothing is interned; a table that kept them all
+    alive to share subtrees cost far more memory than re-simplifying saves.
+    """
+    __slots__ = ("op", "args")
 
     def __new__(cls, op, args):
         o = object.__new__(cls)
         o.op = op
-        o.args = args
+        o.args = tuple(args)
         return o
     
 
@@ -116,19 +122,21 @@ class Expr:
     def __rpow__(self, other): return Expr("^", [other, self])
     
 class SExpr(Expr):
+    __slots__ = ()
+
     def __new__(cls, op, args):
         # simplify
         if op == "^":
             a, b = args
             
-            if isinstance(b, numbers.Rational):
+            if isinstance(b, rational.RATIONAL):
                 if isinstance(a, SExpr):
                     if a.op in ("*", "/"):
                         return cls(a.op, [cls("^", [arg, b]) for arg in a.args])
                     elif a.op in "^":
                         return cls(a.op, [a.args[0], a.args[1] * b])
         
-        if all(isinstance(a, numbers.Rational) for a in args) and op in BINOPS:
+        if all(isinstance(a, rational.RATIONAL) for a in args) and op in BINOPS:
             result = BINOPS[op](*args)
             if result is not None:
                 return result
@@ -138,6 +146,7 @@ class SExpr(Expr):
     @classmethod
     def simplify(cls, e):
         if isinstance(e, Expr) and not isinstance(e, cls):
+            COUNTS["simplify"] += 1
             return cls(e.op, [cls.simplify(a) for a in e.args])
         return e
     
@@ -153,8 +162,13 @@ DIGITS = {
     8: "8",
     9: "9",
 }
-N_DIGITS = 4 # this has to be 4
+# DIGITS = tables.DECK_JQK
+N_DIGITS = 4 # this has to be 4 for exprs_of (not for test_digits_mitm)
 RESULT = 24
+ORDERED = True # if False, digits can be rearranged
+PROGRESS = True # print hands/s, ETA and the slowest hands, and log every hand's timing to 24.times.jsonl
+
+COUNTS = Counter() # expressions tried, Expr nodes simplified and powers over rational.BIT_BUDGET, per hand in the timing log
 
 def inverse(op, result, other, other_is_right):
     inv = B_INVERSES["right" if other_is_right else "left"][op](other, result)
@@ -236,20 +250,121 @@ def exprs_of(digits):
     for [o1, o2, o3] in itertools.product(BINOPS, repeat=3):
         yield Expr(o2, [Expr(o1, [d1, d2]), Expr(o3, [d3, d4])])
 
+def all_exprs_of(digits):
+    # exprs_of only has to find one solution: INVERSE_MAP keeps one op per value
+    # (X + 0 and X - 0 both need X = 24) and only looks up rational subtree values
+    n_ops = len(digits) - 1
+    for ops in itertools.product(BINOPS, repeat=n_ops):
+        for order in itertools.permutations(range(n_ops), n_ops):
+            yield construct(digits, ops, order)
+
 def test_digits(digits):
     for tree in exprs_of(digits):
+        COUNTS["exprs"] += 1
         if SExpr.simplify(tree) == RESULT:
             return tree
 
-with open("24.txt", "w") as f:
-    for digits in itertools.product(DIGITS, repeat=N_DIGITS):
-        tree = test_digits(digits)
+def unpack(e):
+    if isinstance(e, Expr): return e.op, e.args
 
-        n = "".join(DIGITS[d] for d in digits)
-        
-        if tree is not None:
-            f.write(f"{n}: {tree}")
+def all_solutions(digits, ordered=ORDERED):
+    """Every solution for digits, once per canonical form (see canon.py)"""
+    perms = [digits] if ordered else tables.distinct_permutations(digits)
+    trees = (tree for perm in perms for tree in all_exprs_of(perm) if SExpr.simplify(tree) == RESULT)
+    return canon.unique(trees, unpack)
+
+# INVERSE_MAP only inverts at the root, with one digit (or 2 + 2) known.
+# The search below does that at every level: for each split of a run of digits,
+# the smaller side's values are computed (upward), inverted into the values the
+# other side would need to make the targets, and only those get searched for (downward).
+
+def invertible(op, known, known_is_right):
+    """Whether inverse() finds every rational X with `known op X` (or `X op known`) rational and equal to the target"""
+    if not isinstance(known, rational.RATIONAL): return False
+    if op in ("+", "-"): return True
+    if op == "*": return known != 0
+    if op == "/": return known_is_right or known != 0
+    # X ^ a: X doesn't have to be rational, SExpr turns (6 ^ (7/5) * 5) ^ 5 back into a rational.
+    # log_X(a) only has the positive root; as the base, 0/1/negative values are degenerate
+    if op == "^":
+        if known_is_right: return False
+        return known > 0 and known != 1
+    if op == "log":
+        if known_is_right: return known != 1
+        return 1 < known < 100
+    return False
+
+def forward(digits, lo, hi, memo):
+    """Every (simplified) value that the run digits[lo..hi] makes, mapped to an expression for it"""
+    if (lo, hi) not in memo:
+        if lo == hi:
+            out = {digits[lo]: digits[lo]}
         else:
-            f.write(f"{n}: :(")
-        f.write("\n")
-        f.flush()
\ No newline at end of file
+            out = {}
+            for k in range(lo, hi):
+                left, right = forward(digits, lo, k, memo), forward(digits, k + 1, hi, memo)
+                COUNTS["exprs"] += len(BINOPS) * len(left) * len(right)
+                for op in BINOPS:
+                    for a, ae in left.items():
+                        for b, be in right.items():
+                            v = SExpr(op, [a, b])
+                            if v not in out: out[v] = Expr(op, [ae, be])
+        memo[lo, hi] = out
+    return memo[lo, hi]
+
+def find(digits, lo, hi, targets, memo):
+    """Expressions for each of the (rational) targets that the run digits[lo..hi] can make"""
+    # short runs (or lots of targets): just intersect with what the run makes
+    if hi - lo < 2 or len(targets) > len(BINOPS):
+        return {v: e for v, e in forward(digits, lo, hi, memo).items() if v in targets}
+
+    found = {}
+    for k in range(lo, hi):
+        known_is_right = k - lo > hi - k - 1
+        if known_is_right:
+            known, (olo, ohi) = forward(digits, k + 1, hi, memo), (lo, k)
+        else:
+            known, (olo, ohi) = forward(digits, lo, k, memo), (k + 1, hi)
+
+        def join(op, ke, oe):
+            return Expr(op, [oe, ke] if known_is_right else [ke, oe])
+
+        need = {} # value the other side needs -> [(target, op, known value)]
+        fallback = [] # (op, known value) that can't be inverted
+        for op in BINOPS:
+            for kv in known:
+                if not invertible(op, kv, known_is_right):
+                    fallback.append((op, kv))
+                    continue
+
+                for t in targets:
+                    if t in found: continue
+                    x = inverse(op, t, kv, known_is_right)
+                    if x is not None: need.setdefault(x, []).append((t, op, kv))
+
+        if need:
+            for x, oe in find(digits, olo, ohi, need.keys(), memo).items():
+                for t, op, kv in need[x]:
+                    if t not in found: found[t] = join(op, known[kv], oe)
+
+        # can't invert these, so check them against everything the other side makes
+        if fallback:
+            other = forward(digits, olo, ohi, memo)
+            COUNTS["exprs"] += len(other) * len(fallback)
+            for x, oe in other.items():
+                for op, kv in fallback:
+                    v = SExpr(op, [x, kv] if known_is_right else [kv, x])
+                    if v in targets and v not in found: found[v] = join(op, known[kv], oe)
+
+        if len(found) == len(targets): return found
+
+    return found
+
+def test_digits_mitm(digits):
+    tree = find(digits, 0, len(digits) - 1, {RESULT}, {}).get(RESULT)
+    if tree is not None and SExpr.simplify(tree) == RESULT:
+        return tree
+
+if __name__ == "__main__":
+    progress = tables.Progress(log="24.times.jsonl") if PROGRESS else None
+    tables.write_table_parallel("24.txt", test_digits_mitm, DIGITS, N_DIGITS, ordered=ORDERED, progress=progress)
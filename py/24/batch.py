@@ -0,0 +1,126 @@
+"""
+Batched float evaluation of 24 hands with NumPy
+
+Instead of building and evaluating every expression of every hand one at a time,
+this evaluates each (tree shape, operators, leaf order) combination for a whole
+(H, n) array of hands at once in float64. Only the hands where a combination
+lands within tol of the target are candidates, and only those candidates get
+built as real expressions and checked with the solver's exact evaluator.
+
+Float evaluation doesn't miss anything the exact evaluator would accept as long
+as the intermediate values stay finite and real (always true for + - * /).
+With ^ and log, expressions that only simplify through a non-real intermediate
+(like (-4) ^ (1 / 2)) are missed.
+"""
+
+import itertools
+
+import numpy as np
+
+import tables
+
+def float_log(base, x):
+    return np.log(x) / np.log(base)
+
+FLOAT_OPS = {
+    "+": np.add,
+    "-": np.subtract,
+    "*": np.multiply,
+    "/": np.divide,
+}
+FLOAT_OPS_PLUS = {
+    **FLOAT_OPS,
+    "^": np.power,
+    "log": float_log,
+}
+
+def shapes(lo: int, hi: int):
+    """Every binary tree shape with leaves lo..hi (inclusive), as nested (left, right) tuples of leaf indices"""
+    if lo == hi:
+        yield lo
+        return
+
+    for k in range(lo, hi):
+        for left in shapes(lo, k):
+            for right in shapes(k + 1, hi):
+                yield (left, right)
+
+def eval_shape(shape, ops, leaves):
+    """Evaluate shape with leaf arrays leaves, taking operators from the iterator ops (post-order)"""
+    if isinstance(shape, int): return leaves[shape]
+
+    a = eval_shape(shape[0], ops, leaves)
+    b = eval_shape(shape[1], ops, leaves)
+    return next(ops)(a, b)
+
+def build_shape(shape, ops, leaves, node):
+    """Same traversal as eval_shape, but builds the expression with node(op, a, b)"""
+    if isinstance(shape, int): return leaves[shape]
+
+    a = build_shape(shape[0], ops, leaves, node)
+    b = build_shape(shape[1], ops, leaves, node)
+    return node(next(ops), a, b)
+
+def combinations(n: int, op_names, ordered=True):
+    """(shape, op names, leaf permutation) for every expression over n leaves"""
+    perms = [tuple(range(n))] if ordered else list(itertools.permutations(range(n)))
+
+    for shape in shapes(0, n - 1):
+        for ops in itertools.product(op_names, repeat=n - 1):
+            for perm in perms:
+                yield shape, ops, perm
+
+def candidates(hands: np.ndarray, float_ops, result, ordered=True, tol=1e-9):
+    """
+    The combinations of an (H, n) hand array, plus an (n_combinations, H) bool array
+    of which hands land within tol of result for each combination.
+    """
+    hands = np.asarray(hands, dtype=np.float64)
+    combos = [*combinations(hands.shape[1], float_ops, ordered)]
+    hits = np.zeros((len(combos), len(hands)), dtype=bool)
+
+    with np.errstate(all="ignore"):
+        for i, (shape, ops, perm) in enumerate(combos):
+            leaves = hands[:, perm].T
+            values = eval_shape(shape, (float_ops[o] for o in ops), leaves)
+            hits[i] = np.abs(values - result) <= tol
+
+    return combos, hits
+
+def solve_batch(hands, node, exact, result, float_ops=FLOAT_OPS, ordered=True, tol=1e-9):
+    """
+    A solution (or None) for each hand in hands.
+
+    Candidates are built with node(op, a, b) and confirmed if exact(tree) == result.
+    """
+    hands = [tuple(h) for h in hands]
+    combos, hits = candidates(hands, float_ops, result, ordered, tol)
+
+    out = []
+    for h, hand in enumerate(hands):
+        tree = None
+        for i in np.flatnonzero(hits[:, h]):
+            shape, ops, perm = combos[i]
+            leaves = [hand[p] for p in perm]
+            candidate = build_shape(shape, iter(ops), leaves, node)
+
+            if exact(candidate) == result:
+                tree = candidate
+                break
+        out.append(tree)
+
+    return out
+
+def write_table(
+    path, digits, n_digits, node, exact, result,
+    float_ops=FLOAT_OPS, ordered=True, fmt=str, tol=1e-9, chunk=4096
+):
+    """Same table as tables.write_table, solved chunk hands at a time with solve_batch"""
+    all_hands = [*tables.hands(digits, n_digits)]
+
+    with open(path, "w") as f:
+        for start in range(0, len(all_hands), chunk):
+            part = all_hands[start:start + chunk]
+            for hand, tree in zip(part, solve_batch(part, node, exact, result, float_ops, ordered, tol)):
+                f.write(tables.table_line(hand, tree, digits, fmt))
+                f.write("\n")
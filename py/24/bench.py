@@ -0,0 +1,154 @@
+"""
+Benchmark and regression check for the 24 solvers
+
+Every engine (a test function in one of the solver scripts, or batch.solve_batch
+over one) is run on every hand of each table it is supposed to reproduce, or on a
+fixed random sample of them for the slow ones, and its verdicts (solvable or not)
+are compared against the checked-in 24_*.txt table.
+For each run this prints hands/sec, peak memory (traced in a second pass, since
+tracemalloc slows everything down), the hands whose verdict differs and, for
+scripts with a COUNTS Counter, what the first pass counted (exprs, pow_pruned, ...).
+Caches that outlive a call (reach.Memo, reach.UNARY_CACHE, ...) are warm by the second
+pass, so they only show up in the peak as far as they still grow.
+
+New engines just need an entry in ENGINES. CASES are single calls for what the
+4-digit tables can't catch, each checked for the values it has to find.
+
+    python3 bench.py             # every engine
+    python3 bench.py 24plus4 300 # engines whose name contains 24plus4, 300 hands per table
+    python3 bench.py 24plus all  # engines whose name contains 24plus, every hand of each table
+"""
+
+from collections import Counter
+import importlib.util
+import random
+import sys
+import time
+import tracemalloc
+
+import index
+import tables
+
+DIGITS = {d: str(d) for d in range(10)}
+N_DIGITS = 4
+SAMPLE = 200 # hands per table for the slow engines
+SEED = 24
+
+# table -> alphabet it was generated with
+TABLES = {
+    "24_digits.txt": DIGITS,
+    "24_digits_le.txt": DIGITS,
+    "24_deckJQ.txt": tables.DECK_JQ,
+    "24_deckJQK.txt": tables.DECK_JQK,
+}
+
+# (name, script, test function or "batch" (see solver), tables it has to agree with, hands per table (None: all))
+ENGINES = [
+    ("24 exprs", "24.py", "test_digits", ["24_digits.txt", "24_deckJQ.txt", "24_deckJQK.txt"], None),
+    ("24 dp", "24.py", "test_digits_dp", ["24_digits.txt", "24_deckJQ.txt", "24_deckJQK.txt"], None),
+    ("24 memo", "24.py", "test_digits_memo", ["24_digits.txt", "24_deckJQ.txt", "24_deckJQK.txt"], None),
+    ("24 batch", "24.py", "batch", ["24_digits.txt", "24_deckJQ.txt", "24_deckJQK.txt"], None),
+    ("24plus exprs", "24plus.py", "test_digits", ["24_digits_le.txt"], SAMPLE),
+    ("24plus dp", "24plus.py", "test_digits_unary", ["24_digits_le.txt"], None), # UNARY_DEPTH = 0: plain reach.solve
+    ("24plus4 exprs", "24plus4.py", "test_digits", ["24_digits_le.txt"], SAMPLE),
+    ("24plus4 mitm", "24plus4.py", "test_digits_mitm", ["24_digits_le.txt"], None),
+]
+
+# (name, script, function, args, values the result has to contain)
+CASES = [
+    # 6 ^ (7/5) isn't rational, but SExpr makes (6 ^ (7/5) * 5) ^ 5 = 874800000, so X ^ 5 can't be inverted
+    ("24plus4 find", "24plus4.py", "find", ((6, 7, 5, 5, 5), 0, 4, {874800000}, {}), {874800000}),
+]
+
+SCRIPTS = {}
+
+def load(script):
+    # the solver scripts start with a digit, so they can't be imported by name
+    if script not in SCRIPTS:
+        spec = importlib.util.spec_from_file_location(script[:-3], script)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[spec.name] = module # so tables.counters_of finds its COUNTS
+        spec.loader.exec_module(module)
+        SCRIPTS[script] = module
+    return SCRIPTS[script]
+
+def solver(script, func):
+    """
+    (function from a list of hands to an iterable of their solutions, its COUNTS or None).
+    func is a test function of script, called hand by hand (so solutions can be dropped
+    as they come), or "batch" for batch.solve_batch on the whole list with script's
+    node, eval_tree and RESULT.
+    """
+    module = load(script)
+    if func == "batch":
+        import batch # needs numpy
+        return lambda hands: batch.solve_batch(hands, module.node, module.eval_tree, module.RESULT), None
+
+    test = getattr(module, func)
+    return lambda hands: (test(hand) for hand in hands), tables.counters_of(test)
+
+def sample(table, n=SAMPLE, seed=SEED):
+    """n (hand, solvable) pairs from table (every hand if n is None), the same ones every run"""
+    alphabet = TABLES[table]
+    with open(table, encoding="utf-8") as f:
+        lines = f.readlines()
+
+    all_hands = list(tables.hands(alphabet, N_DIGITS))
+    picks = range(len(all_hands)) if n is None else sorted(random.Random(seed).sample(range(len(all_hands)), n))
+
+    out = []
+    for i in picks:
+        hand = all_hands[i]
+        name, sol = index.parse_line(lines[i])
+        if name != "".join(alphabet[d] for d in hand):
+            raise ValueError(f"{table} line {i + 1} ({name}) is out of product order")
+        out.append((hand, sol is not None))
+    return out
+
+def bench(solve, counters, hands):
+    """(hands/sec, peak memory in bytes, [hands whose verdict differs], {counter: increase})"""
+    before = Counter(counters)
+    just_hands = [hand for hand, _ in hands]
+
+    start = time.perf_counter()
+    verdicts = [tree is not None for tree in solve(just_hands)]
+    elapsed = time.perf_counter() - start
+    counts = Counter(counters) - before
+
+    tracemalloc.start()
+    for _ in solve(just_hands): pass # solutions are dropped as they come, like the table writers do
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    wrong = [hand for (hand, expected), got in zip(hands, verdicts) if got != expected]
+    return len(hands) / elapsed, peak, wrong, counts
+
+if __name__ == "__main__":
+    pattern = sys.argv[1] if len(sys.argv) > 1 else ""
+    # hands per table for every engine ("all": every hand) instead of each one's own
+    override = sys.argv[2] if len(sys.argv) > 2 else None
+
+    samples = {}
+    failed = False
+    for name, script, func, checks, n in ENGINES:
+        if pattern not in name: continue
+        if override is not None: n = None if override == "all" else int(override)
+        solve, counters = solver(script, func)
+
+        for table in checks:
+            if (table, n) not in samples: samples[table, n] = sample(table, n)
+
+            rate, peak, wrong, counts = bench(solve, counters, samples[table, n])
+            print(f"{name:14} {table:17} {rate:9.1f} hands/s {peak / 1024:9.1f} KiB peak  {len(wrong)} wrong")
+            if counts: print("    " + " ".join(f"{k}={v}" for k, v in sorted(counts.items())))
+            for hand in wrong[:10]:
+                print(f"    {''.join(TABLES[table][d] for d in hand)}")
+            failed |= bool(wrong)
+
+    for name, script, func, args, expected in CASES:
+        if pattern not in name: continue
+        missing = expected - set(getattr(load(script), func)(*args))
+        print(f"{name:14} {'case':17} {'missing ' + str(sorted(missing)) if missing else 'ok'}")
+        failed |= bool(missing)
+
+    sys.exit(1 if failed else 0)
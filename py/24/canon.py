@@ -0,0 +1,45 @@
+"""
+Canonical forms for 24 expressions
+
+Two expressions get the same canonical form if they only differ by
+commutativity and associativity of + and *, e.g. (a + b) + c, c + (b + a)
+and a + (b + c) are all ("+", a, b, c). The forms are nested tuples, so they
+can go straight into a set to deduplicate solutions.
+
+Expression types differ between the solvers (dicts in 24.py, Expr in 24plus*.py),
+so the caller passes unpack(tree) -> (op, args), or None for a leaf.
+"""
+
+COMMUTATIVE = {"+", "*"}
+
+def sort_key(form):
+    if isinstance(form, tuple):
+        return (1, form[0], tuple(sort_key(a) for a in form[1:]))
+    return (0, form)
+
+def canonical(tree, unpack):
+    node = unpack(tree)
+    if node is None: return tree
+
+    op, args = node
+    args = [canonical(a, unpack) for a in args]
+
+    if op in COMMUTATIVE:
+        flat = []
+        for a in args:
+            if isinstance(a, tuple) and a[0] == op:
+                flat.extend(a[1:])
+            else:
+                flat.append(a)
+        return (op, *sorted(flat, key=sort_key))
+
+    return (op, *args)
+
+def unique(trees, unpack):
+    """trees, minus any that have the same canonical form as an earlier one"""
+    seen = set()
+    for tree in trees:
+        form = canonical(tree, unpack)
+        if form not in seen:
+            seen.add(form)
+            yield tree
@@ -0,0 +1,55 @@
+"""
+Hand completion: which fourth card makes three known cards solvable?
+
+The reachable-value table of the three known cards (reach.py) is computed once.
+Each candidate fourth card x then only adds the sub-hands that use x
+(reach.extend), instead of re-solving {a, b, c, x} from nothing for every x.
+
+Cards can be played in any order, so this searches all orderings (ordered=False).
+
+Running this writes the full completion tables for the digits and JQK decks:
+one line per multiset of three cards, listing the fourth cards that work.
+"""
+
+import itertools
+
+import reach
+import tables
+
+RESULT = 24
+
+def completions(cards, candidates, ops=reach.OPERATIONS, result=RESULT, ordered=False):
+    """{x: (value table of cards + (x,)) or None} for each x in candidates, None if cards + (x,) is unsolvable"""
+    cards = tuple(cards)
+    base = reach.reachable(cards, ops, ordered)
+    full = (1 << (len(cards) + 1)) - 1
+
+    out = {}
+    for x in candidates:
+        table = reach.extend(base, (*cards, x), ops, ordered, stop=result)
+        out[x] = table if result in table[full] else None
+    return out
+
+def completing_cards(cards, candidates, **kwargs):
+    """The cards x in candidates that make cards + (x,) solvable"""
+    return [x for x, table in completions(cards, candidates, **kwargs).items() if table is not None]
+
+def solution(cards, x, table, node):
+    """Rebuild the solution for cards + (x,) from its completions table"""
+    hand = (*cards, x)
+    return reach.rebuild(table, hand, (1 << len(hand)) - 1, RESULT, node)
+
+def write_completion_table(path, deck):
+    with open(path, "w") as f:
+        for cards in itertools.combinations_with_replacement(deck, 3):
+            xs = completing_cards(cards, deck)
+            hand = "".join(deck[c] for c in cards)
+
+            if xs:
+                f.write(f"{hand}: {' '.join(deck[x] for x in xs)}\n")
+            else:
+                f.write(f"{hand}: :(\n")
+
+if __name__ == "__main__":
+    write_completion_table("24_complete_digits.txt", {d: str(d) for d in range(10)})
+    write_completion_table("24_complete_deckJQK.txt", tables.DECK_JQK)
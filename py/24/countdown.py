@@ -0,0 +1,93 @@
+"""
+"Countdown" numbers game solver
+
+Given 5-7 numbers and a target (up to 999), make the target using + - * /
+on some of the numbers (each at most once). Every intermediate result has to be
+a positive integer, so subtraction only goes big - small and division has to
+be exact.
+
+Built on the same bitmask tables as reach.py: every subset of the numbers gets
+its set of reachable values (with back-pointers), but since not every number has
+to be used, the answer is searched across all subsets, and if the target can't
+be made, the closest value any subset makes is reported instead.
+
+`python3 countdown.py 952 25 50 75 100 3 6`
+"""
+
+import sys
+
+import reach
+
+def combine(left: dict, right: dict, out: dict, lmask: int, rmask: int):
+    """Every positive integer made from one value of left and one of right (each unordered pair only once)"""
+    for x in left:
+        for y in right:
+            if x < y:
+                a, b, am, bm = y, x, rmask, lmask
+            else:
+                a, b, am, bm = x, y, lmask, rmask
+
+            # x * 1 and x / 1 just make x again, which the smaller subset already has
+            results = [("+", a + b)]
+            if b != 1:
+                results.append(("*", a * b))
+                if a % b == 0: results.append(("/", a // b))
+            if a != b: results.append(("-", a - b))
+
+            for op, v in results:
+                if v not in out:
+                    out[v] = (op, am, a, bm, b)
+
+def reachable(numbers) -> "list[dict]":
+    """table[mask] = {value: back-pointer} for every subset of numbers (see reach.reachable)"""
+    n = len(numbers)
+    table = [None] * (1 << n)
+
+    for mask in range(1, 1 << n):
+        if mask & (mask - 1) == 0:
+            table[mask] = {numbers[mask.bit_length() - 1]: None}
+            continue
+
+        out = table[mask] = {}
+        for lmask, rmask in reach.splits(mask, ordered=False):
+            if lmask > rmask: continue # (rmask, lmask) covers it
+            combine(table[lmask], table[rmask], out, lmask, rmask)
+
+    return table
+
+class Node:
+    def __init__(self, op, a, b):
+        self.op, self.a, self.b = op, a, b
+
+    def __str__(self):
+        a = f"({self.a})" if isinstance(self.a, Node) else f"{self.a}"
+        b = f"({self.b})" if isinstance(self.b, Node) else f"{self.b}"
+        return f"{a} {self.op} {b}"
+
+def solve(numbers, target: int):
+    """
+    (value, expression) for the target, or for the closest value to it
+    that any subset of numbers makes (ties go to the smaller value).
+    """
+    numbers = tuple(numbers)
+    table = reachable(numbers)
+
+    best = None
+    for mask in range(1, len(table)):
+        for v in table[mask]:
+            key = (abs(v - target), v)
+            if best is None or key < best[0]:
+                best = key, mask, v
+        if best[0][0] == 0: break
+
+    _, mask, v = best
+    return v, reach.rebuild(table, numbers, mask, v, Node)
+
+if __name__ == "__main__":
+    target, *numbers = map(int, sys.argv[1:])
+    v, expr = solve(numbers, target)
+
+    if v == target:
+        print(f"{expr} = {v}")
+    else:
+        print(f"{target} is not reachable, closest: {expr} = {v} ({abs(v - target)} off)")
@@ -0,0 +1,165 @@
+"""
+Binary index over the generated 24 tables
+
+The 24_*.txt tables list every hand in itertools.product order, so a hand's
+line number can be computed straight from its symbols. `build` turns a table into:
+
+    header   magic, version, n_digits, alphabet size, alphabet symbols
+    offsets  (alphabet size ** n_digits + 1) little-endian uint32s
+    blob     every solution, UTF-8, back to back
+
+Hand i's solution is blob[offsets[i]:offsets[i + 1]] (empty if it's unsolvable).
+`TableIndex` memory-maps that file, so a lookup reads two offsets and one slice,
+and bulk queries walk the offsets without ever loading the text table.
+
+    python3 index.py build 24_digits.txt 24_digits.idx
+    python3 index.py get 24_digits.idx 1118
+    python3 index.py unsolvable 24_digits.idx 7
+"""
+
+from array import array
+import mmap
+import struct
+import sys
+
+MAGIC = b"24IX"
+# array item sizes are platform-dependent; the file format (and _span) is uint32
+OFFSET_TYPE = next((t for t in "IL" if array(t).itemsize == 4), None)
+VERSION = 1
+HEADER = struct.Struct("<4sBBH")
+UNSOLVABLE = ":("
+
+def parse_line(line: str):
+    hand, sol = line.rstrip("\n").split(": ", 1)
+    return hand, (None if sol == UNSOLVABLE else sol)
+
+def read_alphabet(path):
+    """Alphabet of a table, in order (the last symbol of the first hands cycles through it)"""
+    alphabet, hand = [], ""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            hand, _ = parse_line(line)
+            if hand[-1] in alphabet: break
+            alphabet.append(hand[-1])
+    return alphabet, len(hand)
+
+def build(table_path, index_path):
+    alphabet, n_digits = read_alphabet(table_path)
+    if not alphabet:
+        raise ValueError(f"expected a table of hands, {table_path} is empty")
+    if OFFSET_TYPE is None:
+        raise RuntimeError("no 4-byte array typecode on this platform")
+    if any(len(s.encode()) != 1 for s in alphabet):
+        raise ValueError("alphabet symbols have to be single (ASCII) characters")
+
+    base = len(alphabet)
+    n_hands = base ** n_digits
+    offsets = array(OFFSET_TYPE, [0]) * (n_hands + 1)
+    header = HEADER.pack(MAGIC, VERSION, n_digits, base) + "".join(alphabet).encode()
+
+    with open(table_path, encoding="utf-8") as table, open(index_path, "wb") as out:
+        out.write(header)
+        out.write(offsets.tobytes()) # placeholder, filled in at the end
+
+        pos, i = 0, -1
+        for i, line in enumerate(table):
+            hand, sol = parse_line(line)
+            if i >= n_hands or hand != hand_of(i, alphabet, n_digits):
+                raise ValueError(f"line {i + 1} ({hand}) is out of product order")
+
+            if sol is not None:
+                data = sol.encode()
+                out.write(data)
+                pos += len(data)
+            offsets[i + 1] = pos
+
+        if i + 1 != n_hands:
+            raise ValueError(f"expected {n_hands} hands, found {i + 1}")
+
+        out.seek(len(header))
+        if sys.byteorder != "little": offsets.byteswap()
+        out.write(offsets.tobytes())
+
+def hand_of(i: int, alphabet, n_digits: int) -> str:
+    base = len(alphabet)
+    symbols = []
+    for _ in range(n_digits):
+        i, r = divmod(i, base)
+        symbols.append(alphabet[r])
+    return "".join(reversed(symbols))
+
+class TableIndex:
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.n_digits, base = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} 24 table index")
+
+        start = HEADER.size
+        self.alphabet = self.mm[start:start + base].decode()
+        self.symbol_index = {s: j for j, s in enumerate(self.alphabet)}
+
+        self.n_hands = base ** self.n_digits
+        self.offsets_at = start + base
+        self.blob_at = self.offsets_at + 4 * (self.n_hands + 1)
+
+    def close(self):
+        self.mm.close()
+        self.file.close()
+
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.close()
+    def __len__(self): return self.n_hands
+
+    def slot(self, hand: str) -> int:
+        """Position of hand (a string of alphabet symbols) in the table"""
+        if len(hand) != self.n_digits: raise KeyError(hand)
+
+        i = 0
+        for s in hand:
+            i = i * len(self.alphabet) + self.symbol_index[s]
+        return i
+
+    def _span(self, i: int):
+        return struct.unpack_from("<II", self.mm, self.offsets_at + 4 * i)
+
+    def _solution(self, i: int):
+        lo, hi = self._span(i)
+        if lo == hi: return None
+        return self.mm[self.blob_at + lo:self.blob_at + hi].decode()
+
+    def solvable(self, hand: str) -> bool:
+        lo, hi = self._span(self.slot(hand))
+        return lo != hi
+
+    def get(self, hand: str):
+        """The table's solution for hand, or None if it's unsolvable"""
+        return self._solution(self.slot(hand))
+
+    def query(self, contains: str = None, solvable: bool = None):
+        """Yields (hand, solution) for every hand that has the symbol contains, filtered by solvability"""
+        for i in range(self.n_hands):
+            hand = hand_of(i, self.alphabet, self.n_digits)
+            if contains is not None and contains not in hand: continue
+
+            lo, hi = self._span(i)
+            if solvable is not None and (lo != hi) != solvable: continue
+
+            yield hand, self._solution(i)
+
+if __name__ == "__main__":
+    cmd, *args = sys.argv[1:]
+
+    if cmd == "build":
+        build(*args)
+    elif cmd == "get":
+        path, hand = args
+        with TableIndex(path) as idx:
+            print(f"{hand}: {idx.get(hand) or UNSOLVABLE}")
+    elif cmd == "unsolvable":
+        path, symbol = args
+        with TableIndex(path) as idx:
+            for hand, _ in idx.query(contains=symbol, solvable=False):
+                print(hand)
@@ -0,0 +1,219 @@
+"""
+Small exact rational kernel for the 24 solvers
+
+Integral values stay plain ints; everything else is a Q, a slotted
+(numerator, denominator) pair that is always in lowest terms with d > 1.
+That makes equality and hashing plain tuple work, and the add/sub/mul/div
+functions skip the gcd whenever the result is already known to be reduced
+(int + Q, int * int, ...) and otherwise do exactly one gcd per operation.
+
+Compared to fractions.Fraction, this avoids the generic numbers-tower dispatch
+and the normalisation done in Fraction.__new__ for every intermediate value.
+Q doesn't mix with Fraction (it isn't a numbers.Rational, and never compares
+equal to one); convert with Fraction(q.numerator, q.denominator).
+
+Powers are the one operation that can blow values up, so pow_bounded refuses
+(before computing anything) results whose numerator or denominator would be
+over BIT_BUDGET bits, and counts how often it did (in PRUNED, or the
+caller's Counter, e.g. a solver's per-hand COUNTS). root and ilog
+are the exact inverses: k-th roots and integer logarithms, without floats.
+"""
+
+from collections import Counter
+from math import gcd
+
+class Q:
+    __slots__ = ("n", "d")
+
+    def __init__(self, n: int, d: int):
+        q = reduce(n, d)
+        if isinstance(q, int): raise ValueError(f"{n}/{d} is integral")
+        self.n, self.d = q.n, q.d
+
+    @property
+    def numerator(self): return self.n
+    @property
+    def denominator(self): return self.d
+
+    def __repr__(self): return f"Q({self.n}, {self.d})"
+    def __str__(self): return f"{self.n}/{self.d}"
+    def __float__(self): return self.n / self.d
+
+    def __eq__(self, other):
+        if isinstance(other, Q): return self.n == other.n and self.d == other.d
+        if isinstance(other, int): return False
+        return NotImplemented
+    def __hash__(self): return hash((self.n, self.d))
+
+    def _cmp(self, other):
+        # sign of self - other
+        if isinstance(other, Q): diff = self.n * other.d - other.n * self.d
+        elif isinstance(other, int): diff = self.n - other * self.d
+        else: return NotImplemented
+        return (diff > 0) - (diff < 0)
+
+    def __lt__(self, other):
+        c = self._cmp(other)
+        return c if c is NotImplemented else c < 0
+    def __le__(self, other):
+        c = self._cmp(other)
+        return c if c is NotImplemented else c <= 0
+    def __gt__(self, other):
+        c = self._cmp(other)
+        return c if c is NotImplemented else c > 0
+    def __ge__(self, other):
+        c = self._cmp(other)
+        return c if c is NotImplemented else c >= 0
+
+    def __neg__(self): return _q(-self.n, self.d)
+    def __abs__(self): return _q(abs(self.n), self.d)
+
+    def __add__(self, other): return add(self, other)
+    def __radd__(self, other): return add(other, self)
+    def __sub__(self, other): return sub(self, other)
+    def __rsub__(self, other): return sub(other, self)
+    def __mul__(self, other): return mul(self, other)
+    def __rmul__(self, other): return mul(other, self)
+    def __truediv__(self, other): return div(self, other)
+    def __rtruediv__(self, other): return div(other, self)
+    def __pow__(self, other): return pow_(self, other)
+
+# Q isn't registered as a numbers.Rational: it would then compare equal to the
+# Fraction of the same value, which hashes differently (hash(Fraction) isn't tuple work).
+# Q(n, d) and Fraction(n, d) are simply different values, like Fraction and Decimal.
+RATIONAL = (int, Q)
+
+def _q(n: int, d: int) -> Q:
+    # n/d is already in lowest terms and d > 1
+    q = object.__new__(Q)
+    q.n = n
+    q.d = d
+    return q
+
+def reduce(n: int, d: int) -> "int | Q":
+    """n/d in lowest terms (d != 0)"""
+    if d < 0: n, d = -n, -d
+    g = gcd(n, d)
+    if g != 1:
+        n //= g
+        d //= g
+    return n if d == 1 else _q(n, d)
+
+def add(a, b):
+    if type(a) is int:
+        if type(b) is int: return a + b
+        return _q(a * b.d + b.n, b.d)
+    if type(b) is int: return _q(a.n + b * a.d, a.d)
+    return reduce(a.n * b.d + b.n * a.d, a.d * b.d)
+
+def sub(a, b):
+    if type(a) is int:
+        if type(b) is int: return a - b
+        return _q(a * b.d - b.n, b.d)
+    if type(b) is int: return _q(a.n - b * a.d, a.d)
+    return reduce(a.n * b.d - b.n * a.d, a.d * b.d)
+
+def mul(a, b):
+    if type(a) is int:
+        if type(b) is int: return a * b
+        return reduce(a * b.n, b.d)
+    if type(b) is int: return reduce(a.n * b, a.d)
+    return reduce(a.n * b.n, a.d * b.d)
+
+def div(a, b):
+    """a / b, or None if b is 0"""
+    if b == 0: return None
+    if type(a) is int:
+        if type(b) is int:
+            if a % b == 0: return a // b
+            return reduce(a, b)
+        return reduce(a * b.d, b.n)
+    if type(b) is int: return reduce(a.n, a.d * b)
+    return reduce(a.n * b.d, a.d * b.n)
+
+def pow_(a, b: int):
+    """a ** b for integral b (0 ** 0 = 1), or None if it's 0 ** (negative)"""
+    if b == 0: return 1
+    if b > 0:
+        if type(a) is int: return a ** b
+        return _q(a.n ** b, a.d ** b)
+
+    if a == 0: return None
+    if type(a) is int: return reduce(1, a ** -b)
+    return reduce(a.d ** -b, a.n ** -b)
+
+BIT_BUDGET = 128
+PRUNED = Counter()
+
+def bits(a) -> int:
+    """Bit length of the larger of a's numerator and denominator"""
+    if type(a) is int: return abs(a).bit_length()
+    return max(abs(a.n).bit_length(), a.d.bit_length())
+
+def pow_bounded(a, b: int, budget: int = None, pruned: Counter = PRUNED):
+    """
+    pow_(a, b), or None if the result would be over budget (default BIT_BUDGET) bits.
+    Refusals are counted as pruned["pow_pruned"].
+    """
+    if budget is None: budget = BIT_BUDGET
+
+    # |a| ** |b| has at most bits(a) * |b| bits, so this never lets anything bigger through
+    if bits(a) * abs(b) > budget:
+        pruned["pow_pruned"] += 1
+        return None
+    return pow_(a, b)
+
+def iroot(n: int, k: int):
+    """The integer r with r ** k == n (n >= 0, k > 0), or None"""
+    if n < 2: return n
+    if k >= n.bit_length(): return None # 2 ** k > n
+
+    # Newton's method from above, on ints only
+    r = 1 << -(-n.bit_length() // k)
+    while True:
+        y = ((k - 1) * r + n // r ** (k - 1)) // k
+        if y >= r: break
+        r = y
+    return r if r ** k == n else None
+
+def root(a, k: int):
+    """The real k-th root of a (the positive one for even k) if it's rational, else None"""
+    if k < 0:
+        a = div(1, a)
+        if a is None: return None
+        k = -k
+    if k == 0: return None
+    if k == 1: return a
+
+    if a < 0:
+        if k % 2 == 0: return None
+        r = root(-a, k)
+        return None if r is None else -r
+
+    if type(a) is int: return iroot(a, k)
+    n, d = iroot(a.n, k), iroot(a.d, k)
+    if n is None or d is None: return None
+    return _q(n, d)
+
+def _ilog(p: int, r: int):
+    # l with p ** l == r (p > 1, r >= 1), or None
+    l = 0
+    while r % p == 0:
+        r //= p
+        l += 1
+    return l if r == 1 else None
+
+def ilog(base, x):
+    """The integer l with base ** l == x (base > 0, base != 1, x > 0), or None"""
+    if base <= 0 or base == 1 or x <= 0: return None
+    if x == 1: return 0
+
+    sign = 1
+    if (base > 1) != (x > 1): x, sign = div(1, x), -1
+
+    # base = p/q and x = r/s in lowest terms, so base ** l == x means p ** l == r and q ** l == s
+    p, q = base.numerator, base.denominator
+    r = x.numerator
+    l = _ilog(p, r) if p != 1 else _ilog(q, x.denominator)
+    if l is None or pow_(base, l) != x: return None
+    return sign * l
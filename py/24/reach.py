@@ -0,0 +1,281 @@
+"""
+Reachable-value tables for the 24 solvers
+
+A hand of n values is indexed by bitmask (bit i set = hand[i] is used).
+`reachable` works bottom-up: each sub-hand gets the set of values it can make,
+built by combining pairs of disjoint sub-hands once, instead of re-evaluating
+every subtree of every candidate expression.
+
+Every value remembers the combination that first produced it (a back-pointer),
+so `rebuild` only constructs the one expression that actually hits the target.
+
+With ordered=True, only contiguous runs of the hand count as sub-hands and a
+run is only ever split into a left and right run. This is the same search
+space as `exprs_of` in 24.py, which never reorders the digits.
+
+Unary operators (factorial, square root, ...) don't split a sub-hand, so they are
+handled by `close`: each sub-hand's values are closed under them, up to a maximum
+nesting depth, before they get combined any further.
+
+`Memo` keeps the same kind of value sets per sub-hand across a whole table run,
+so hands that share 2- and 3-value sub-hands don't recompute them.
+"""
+
+from collections import OrderedDict
+
+import rational
+
+# the + - * / of 24.py, for the tools that don't define their own
+OPERATIONS = {
+    "+": rational.add,
+    "-": rational.sub,
+    "*": rational.mul,
+    "/": rational.div
+}
+
+def is_run(mask: int) -> bool:
+    """Whether the set bits of mask are contiguous"""
+    low = mask & -mask
+    return (mask + low) & mask == 0
+
+def splits(mask: int, ordered: bool):
+    """(left, right) pairs of non-empty sub-hands that make up mask"""
+    if ordered:
+        low = mask & -mask
+        left = low
+        while left != mask:
+            yield left, mask ^ left
+            left |= left << 1
+    else:
+        sub = (mask - 1) & mask
+        while sub:
+            yield sub, mask ^ sub
+            sub = (sub - 1) & mask
+
+def combine(ops, left: dict, right: dict, out: dict, lmask: int, rmask: int, stop=None):
+    """
+    Add every `a op b` for a in left, b in right to out (if not already there).
+    Returns True (and stops early) once stop has been added.
+    """
+    for name, f in ops.items():
+        for a in left:
+            for b in right:
+                try:
+                    v = f(a, b)
+                except ZeroDivisionError:
+                    continue
+
+                if v is not None and v not in out:
+                    out[v] = (name, lmask, a, rmask, b)
+                    if v == stop: return True
+    return False
+
+UNARY_CACHE = {}
+MAX_UNARY_CACHE = 1 << 16 # UNARY_CACHE gets emptied when it's this big
+
+def close(out: dict, unops, depth: int, cap: int = None, stop=None):
+    """
+    Add f(v) to out for every unary op f and value v in out, nested up to depth times,
+    with back-pointer (op, v). Values over cap bits (default rational.BIT_BUDGET) are dropped.
+    Returns True (and stops early) once stop has been added.
+    """
+    if cap is None: cap = rational.BIT_BUDGET
+    if len(UNARY_CACHE) >= MAX_UNARY_CACHE: UNARY_CACHE.clear()
+
+    frontier = list(out)
+    for _ in range(depth):
+        new = []
+        for a in frontier:
+            for name, f in unops.items():
+                key = (name, a)
+                if key in UNARY_CACHE:
+                    v = UNARY_CACHE[key]
+                else:
+                    v = UNARY_CACHE[key] = f(a)
+
+                if v is not None and v not in out and rational.bits(v) <= cap:
+                    out[v] = (name, a)
+                    if v == stop: return True
+                    new.append(v)
+        frontier = new
+    return False
+
+def reachable(hand, ops, ordered=True, stop=None, unops=None, depth=1) -> "list[dict | None]":
+    """
+    table[mask] maps each value the sub-hand `mask` can make to its back-pointer:
+    None for a single hand value, (op, value) for a unary op on another value of the same sub-hand,
+    otherwise (op, left mask, left value, right mask, right value).
+
+    Sub-hands that aren't searched (non-contiguous masks if ordered) are None.
+    If stop is given, the full hand's entry is only filled until stop is reached.
+    """
+    table = [None]
+    for k in range(1, len(hand) + 1):
+        table = extend(table, hand[:k], ops, ordered, stop if k == len(hand) else None, unops, depth)
+    return table
+
+def extend(table, hand, ops, ordered=True, stop=None, unops=None, depth=1) -> "list[dict | None]":
+    """
+    The table for hand, given the table for hand[:-1].
+
+    Every sub-hand without the last value is already in the old table,
+    so only the sub-hands that use the last value get computed.
+    """
+    n = len(hand)
+    full = (1 << n) - 1
+    table = table + [None] * (1 << (n - 1))
+
+    for mask in range(1 << (n - 1), 1 << n):
+        target = stop if mask == full else None
+        if mask & (mask - 1) == 0:
+            out = table[mask] = {hand[-1]: None}
+        elif ordered and not is_run(mask):
+            continue
+        else:
+            out = table[mask] = {}
+            for lmask, rmask in splits(mask, ordered):
+                if combine(ops, table[lmask], table[rmask], out, lmask, rmask, target): break
+
+        if unops and (target is None or target not in out):
+            close(out, unops, depth, stop=target)
+
+    return table
+
+def rebuild(table, hand, mask: int, value, node):
+    """Build the expression that makes value out of sub-hand mask, using node(op, a, b) (or node(op, a)) for each operation"""
+    bp = table[mask][value]
+    if bp is None: return hand[mask.bit_length() - 1]
+    if len(bp) == 2:
+        op, a = bp
+        return node(op, rebuild(table, hand, mask, a, node))
+
+    op, lmask, a, rmask, b = bp
+    return node(op, rebuild(table, hand, lmask, a, node), rebuild(table, hand, rmask, b, node))
+
+def solve(hand, ops, result, node, ordered=True, unops=None, depth=1):
+    """An expression (built with node) for result using all of hand, or None"""
+    table = reachable(hand, ops, ordered, result, unops, depth)
+    full = (1 << len(hand)) - 1
+
+    if result in table[full]:
+        return rebuild(table, hand, full, result, node)
+
+class Memo:
+    """
+    Reachable values of sub-hands, shared between hands.
+
+    Sub-hands are keyed by their values (sorted, if not ordered), and every value
+    maps to an expression for it: a hand value, or an (op, a, b) tuple.
+    At most maxsize sub-hands are kept, least recently used ones are dropped first.
+
+    Ordered, every value also keeps the rank of its expression in the order
+    construct-based exprs_of (24plus.py, and 24.py's that 24_digits.txt was made
+    with) builds trees in: ops by position first, then merge order. The lowest
+    rank wins, so solve finds the same expression as exprs_of's first hit. A rank is the tuple (op at each position) + (merge
+    order), where the merge order is the earliest permutation of the positions
+    that builds the tree: left subtree's, then right subtree's, then the root's.
+    """
+
+    def __init__(self, ops=OPERATIONS, ordered=True, maxsize=1 << 16):
+        self.ops = ops
+        self.ordered = ordered
+        self.maxsize = maxsize
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def values(self, hand) -> dict:
+        """value -> (rank, expression) for every value hand can make (ranks are () if not ordered)"""
+        key = tuple(hand) if self.ordered else tuple(sorted(hand))
+
+        out = self.cache.get(key)
+        if out is not None:
+            self.hits += 1
+            self.cache.move_to_end(key)
+            return out
+
+        self.misses += 1
+        if len(key) == 1:
+            out = {key[0]: ((), key[0])}
+        else:
+            out = {}
+            for v, name, rank, ae, be in self.combinations(key):
+                if v not in out or rank < out[v][0]:
+                    out[v] = (rank, (name, ae, be))
+
+        self.cache[key] = out
+        if len(self.cache) > self.maxsize: self.cache.popitem(last=False)
+        return out
+
+    def combinations(self, key, only=None):
+        """
+        (a op b, op, rank, a's expression, b's expression) for every split of key into a and b,
+        and every op. If only is given, just the ones where a op b == only.
+        """
+        for k, (left, right) in enumerate(self.halves(key), 1):
+            lvals, rvals = self.values(left), self.values(right)
+            for i, (name, f) in enumerate(self.ops.items()):
+                for a, (ar, ae) in lvals.items():
+                    for b, (br, be) in rvals.items():
+                        try:
+                            v = f(a, b)
+                        except ZeroDivisionError:
+                            continue
+                        if v is None or (only is not None and v != only): continue
+
+                        if self.ordered:
+                            # left has positions 0..k-2, the root is k-1 and right's are shifted by k
+                            m = len(right) - 1
+                            rank = ar[:k - 1] + (i,) + br[:m] + ar[k - 1:] + tuple(p + k for p in br[m:]) + (k - 1,)
+                        else:
+                            rank = ()
+                        yield v, name, rank, ae, be
+
+    def halves(self, key):
+        """(left, right) sub-hands of key, each distinct pair once"""
+        n = len(key)
+        if self.ordered:
+            for k in range(1, n):
+                yield key[:k], key[k:]
+            return
+
+        seen = set()
+        for lmask, rmask in splits((1 << n) - 1, ordered=False):
+            left = tuple(v for i, v in enumerate(key) if lmask >> i & 1)
+            right = tuple(v for i, v in enumerate(key) if rmask >> i & 1)
+            if (left, right) not in seen:
+                seen.add((left, right))
+                yield left, right
+
+    def solve(self, hand, result, node):
+        """An expression (built with node) for result using all of hand, or None"""
+        key = tuple(hand) if self.ordered else tuple(sorted(hand))
+        if len(key) == 1:
+            return key[0] if key[0] == result else None
+
+        # the full hand is only looked up once per table, so it isn't cached.
+        # Unordered, the search stops as soon as result turns up; ordered, the lowest rank wins
+        best = None
+        for _, name, rank, ae, be in self.combinations(key, result):
+            if not self.ordered: return node(name, to_tree(ae, node), to_tree(be, node))
+            if best is None or rank < best[0]: best = (rank, name, ae, be)
+
+        if best is not None:
+            _, name, ae, be = best
+            return node(name, to_tree(ae, node), to_tree(be, node))
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0,
+            "size": len(self.cache),
+        }
+
+def to_tree(expr, node):
+    """Turn a Memo expression into the caller's expression type with node(op, a, b)"""
+    if not isinstance(expr, tuple): return expr
+
+    op, a, b = expr
+    return node(op, to_tree(a, node), to_tree(b, node))
@@ -0,0 +1,64 @@
+"""
+Multi-target 24 tables in one pass
+
+Instead of rerunning the whole search once per target, each hand's full table of
+reachable values (reach.py) is computed once, then every target in TARGETS is
+looked up in it. This writes one table per target (same format as the 24.txt
+tables) plus a histogram of how many hands can reach each integer in HIST_RANGE.
+"""
+
+from collections import Counter
+
+import reach
+import tables
+
+DIGITS = {d: str(d) for d in range(10)}
+# DIGITS = tables.DECK_JQK
+N_DIGITS = 4
+ORDERED = True # if False, digits can be rearranged
+
+TARGETS = [10, 24, 36, 100]
+HIST_RANGE = range(0, 101)
+
+def node(op, a, b):
+    return f"({a} {op} {b})"
+
+def sweep(hand, targets, ops=reach.OPERATIONS, ordered=True):
+    """The full hand's reachable values, and an expression (or None) for each target"""
+    table = reach.reachable(hand, ops, ordered)
+    full = (1 << len(hand)) - 1
+    values = table[full]
+
+    solutions = {}
+    for t in targets:
+        if t in values:
+            solutions[t] = reach.rebuild(table, hand, full, t, node)[1:-1]
+        else:
+            solutions[t] = None
+    return values, solutions
+
+def sweep_table(digits, n_digits, targets, hist_range, ops=reach.OPERATIONS, ordered=True):
+    """Yields (hand, {target: solution}) for every hand; the returned Counter fills in as it goes"""
+    hist = Counter()
+
+    def gen():
+        for hand in tables.hands(digits, n_digits):
+            values, solutions = sweep(hand, targets, ops, ordered)
+            hist.update(v for v in hist_range if v in values)
+            yield hand, solutions
+
+    return gen(), hist
+
+if __name__ == "__main__":
+    results, hist = sweep_table(DIGITS, N_DIGITS, TARGETS, HIST_RANGE, ordered=ORDERED)
+
+    files = {t: open(f"{t}.txt", "w") for t in TARGETS}
+    for hand, solutions in results:
+        for t, sol in solutions.items():
+            files[t].write(tables.table_line(hand, sol, DIGITS))
+            files[t].write("\n")
+    for f in files.values(): f.close()
+
+    with open("hist.txt", "w") as f:
+        for v in HIST_RANGE:
+            f.write(f"{v}: {hist[v]}\n")
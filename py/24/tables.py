@@ -0,0 +1,380 @@
+"""
+Table generation for the 24 solvers
+
+Each driver (24.py, 24plus.py, 24plus4.py) writes one line per hand,
+`{hand}: {solution}` or `{hand}: :(`, in itertools.product order.
+
+If the digits of a hand may be rearranged (ordered=False), a hand's verdict only
+depends on its multiset, so each canonical (sorted) hand is solved once and its
+solution is replayed for every ordering. The leaves of a solution are the hand's
+values, so the stored expression is valid for all orderings of that hand.
+
+`write_table_parallel` splits the hands into shards of consecutive hands and
+solves them on a process pool. Finished shards are appended to a checkpoint
+file, so if the run gets killed, rerunning it only solves the missing shards.
+Each driver has its own checkpoint, which records what it was written for
+(including a hash of the solver's source), so a stale one (other driver,
+alphabet, RESULT, ...) is never merged into a table.
+
+Both drivers take a `Progress`, which times every hand, prints hands/sec and an
+ETA as the table is written, lists the slowest hands at the end and can log
+every hand's timing as JSON lines. Solver scripts that count their work in a
+module-level COUNTS Counter get those counts per hand too, and summed up at the end.
+"""
+
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import hashlib
+import heapq
+import itertools
+import json
+import os
+import sys
+import time
+
+DECK_JQ = {
+    1: "A",
+    **{n: str(n) for n in range(2, 10)},
+    10: "X",
+    11: "J",
+    12: "Q",
+}
+DECK_JQK = {**DECK_JQ, 13: "K"}
+
+def canonical(hand):
+    return tuple(sorted(hand))
+
+def distinct_permutations(hand):
+    return sorted(set(itertools.permutations(hand)))
+
+def solve_any_order(test, hand):
+    """First solution to any ordering of hand, using a solver that keeps the digit order"""
+    for perm in distinct_permutations(hand):
+        tree = test(perm)
+        if tree is not None:
+            return tree
+
+class HandCache:
+    """Solutions keyed by canonical hand, so every multiset is only solved once"""
+
+    def __init__(self, solve):
+        self.solve = solve
+        self.solutions = {}
+
+    def __call__(self, hand):
+        key = canonical(hand)
+        if key not in self.solutions:
+            self.solutions[key] = self.solve(key)
+        return self.solutions[key]
+
+def hands(digits, n_digits):
+    return itertools.product(digits, repeat=n_digits)
+
+def table_line(hand, tree, digits, fmt=str):
+    n = "".join(digits[d] for d in hand)
+
+    if tree is not None:
+        return f"{n}: {fmt(tree)}"
+    return f"{n}: :("
+
+def solver(test, ordered=True, solve_any=None):
+    if ordered: return test
+    if solve_any is None: return HandCache(lambda hand: solve_any_order(test, hand))
+    return HandCache(solve_any)
+
+def counters_of(test):
+    """The COUNTS Counter of the module test is defined in, if it has one"""
+    return getattr(sys.modules.get(getattr(test, "__module__", None)), "COUNTS", None)
+
+def timed_solve(solve, hand, counters=None):
+    """(solution, seconds, {counter: increase}) for one hand"""
+    before = Counter(counters) if counters is not None else None
+
+    start = time.perf_counter()
+    tree = solve(hand)
+    seconds = time.perf_counter() - start
+
+    counts = {}
+    if counters is not None:
+        counts = {k: v - before[k] for k, v in counters.items() if v != before[k]}
+    return tree, seconds, counts
+
+class Progress:
+    """
+    Hands/sec and ETA (printed to out every interval seconds), the slowest hands
+    and the summed counts once the table is done, and if log is given, one JSON
+    line per hand: {"hand", "seconds", "solved", "counts"}.
+    """
+
+    def __init__(self, log=None, slowest=10, interval=5.0, out=sys.stderr):
+        self.log_path = log
+        self.n_slowest = slowest
+        self.interval = interval
+        self.out = out
+
+    def start(self, total: int, done: int = 0):
+        """total hands, done of which are already there (resumed from a checkpoint)"""
+        self.total = total
+        self.done = self.resumed = done
+        self.slowest = [] # min-heap of (seconds, hand, counts)
+        self.counts = Counter() # over every timed hand, from the workers as well
+        self.started = time.perf_counter()
+        self.next_report = self.started + self.interval
+        # a resumed run keeps the records of the hands it isn't going to redo
+        self.log = open(self.log_path, "a" if done else "w") if self.log_path else None
+
+    def record(self, hand: str, seconds: float, solved: bool, counts: dict):
+        if self.log:
+            self.log.write(json.dumps({"hand": hand, "seconds": seconds, "solved": solved, "counts": counts}))
+            self.log.write("\n")
+
+        self.counts.update(counts)
+        entry = (seconds, hand, counts)
+        if len(self.slowest) < self.n_slowest:
+            heapq.heappush(self.slowest, entry)
+        elif entry > self.slowest[0]:
+            heapq.heapreplace(self.slowest, entry)
+
+    def flush(self):
+        """Writes the log out, so a resumed run's log has every hand its checkpoint has"""
+        if self.log: self.log.flush()
+
+    def advance(self, n: int = 1):
+        self.done += n
+        now = time.perf_counter()
+        if now >= self.next_report:
+            self.next_report = now + self.interval
+            self.report(now)
+
+    def rate(self, now):
+        elapsed = now - self.started
+        return (self.done - self.resumed) / elapsed if elapsed else 0
+
+    def report(self, now):
+        rate = self.rate(now)
+        eta = (self.total - self.done) / rate if rate else float("inf")
+        print(f"{self.done}/{self.total} hands, {rate:.1f} hands/s, ETA {eta:.0f}s", file=self.out, flush=True)
+
+    def finish(self):
+        if self.log: self.log.close()
+
+        now = time.perf_counter()
+        print(f"{self.done - self.resumed} hands in {now - self.started:.1f}s, {self.rate(now):.1f} hands/s", file=self.out)
+        if self.counts:
+            print("counts:", " ".join(f"{k}={v}" for k, v in sorted(self.counts.items())), file=self.out)
+        print("slowest hands:", file=self.out)
+        for seconds, hand, counts in sorted(self.slowest, reverse=True):
+            counts = " ".join(f"{k}={v}" for k, v in sorted(counts.items()))
+            print(f"  {hand}: {seconds:.4f}s {counts}", file=self.out)
+
+def write_table(path, test, digits, n_digits, ordered=True, fmt=str, solve_any=None, flush=False, progress=None):
+    """
+    Write the table for every hand of n_digits digits to path.
+
+    test(hand) returns a solution for that exact digit order (or None).
+    If not ordered, hands are solved by multiset with solve_any(hand)
+    (by default, test on each distinct ordering until one works).
+    progress is an optional Progress.
+    """
+    solve = solver(test, ordered, solve_any)
+    counters = counters_of(test)
+    if progress: progress.start(len(digits) ** n_digits)
+
+    with open(path, "w") as f:
+        for hand in hands(digits, n_digits):
+            if progress:
+                tree, seconds, counts = timed_solve(solve, hand, counters)
+                progress.record("".join(digits[d] for d in hand), seconds, tree is not None, counts)
+                progress.advance()
+            else:
+                tree = solve(hand)
+
+            f.write(table_line(hand, tree, digits, fmt))
+            f.write("\n")
+            if flush: f.flush()
+
+    if progress: progress.finish()
+
+def write_counts(path, all_solutions, digits, n_digits):
+    """Write `{hand}: {number of solutions}` for every hand, counting each hand's solutions as they're generated"""
+    with open(path, "w") as f:
+        for hand in hands(digits, n_digits):
+            n = "".join(digits[d] for d in hand)
+            f.write(f"{n}: {sum(1 for _ in all_solutions(hand))}\n")
+
+def solve_shard(test, digits, n_digits, start, stop, ordered=True, fmt=str, solve_any=None, timed=False):
+    """
+    Table lines for hands [start, stop) (in product order).
+    If timed, also returns a (hand, seconds, solved, counts) record for every hand.
+    """
+    solve = solver(test, ordered, solve_any)
+    if not timed:
+        return [
+            table_line(hand, solve(hand), digits, fmt)
+            for hand in itertools.islice(hands(digits, n_digits), start, stop)
+        ]
+
+    counters = counters_of(test)
+    lines, records = [], []
+    for hand in itertools.islice(hands(digits, n_digits), start, stop):
+        tree, seconds, counts = timed_solve(solve, hand, counters)
+        lines.append(table_line(hand, tree, digits, fmt))
+        records.append(("".join(digits[d] for d in hand), seconds, tree is not None, counts))
+    return lines, records
+
+def solve_multisets(test, keys, digits, fmt=str, solve_any=None, timed=False):
+    """
+    fmt(solution) (or None) for each canonical hand in keys, for write_table_parallel's unordered mode.
+    If timed, also returns a (hand, seconds, solved, counts) record for every hand.
+    """
+    solve = solve_any if solve_any is not None else lambda hand: solve_any_order(test, hand)
+    counters = counters_of(solve_any or test)
+
+    solutions, records = [], []
+    for key in keys:
+        if timed:
+            tree, seconds, counts = timed_solve(solve, key, counters)
+            records.append(("".join(digits[d] for d in key), seconds, tree is not None, counts))
+        else:
+            tree = solve(key)
+        solutions.append(None if tree is None else fmt(tree))
+    return (solutions, records) if timed else solutions
+
+def source_of(f):
+    """script:qualname of a function, which (unlike __module__, "__main__" for every driver) tells the drivers apart"""
+    module = sys.modules.get(f.__module__)
+    file = getattr(module, "__file__", None)
+    return f"{os.path.basename(file) if file else f.__module__}:{f.__qualname__}"
+
+def fingerprint(test):
+    """
+    sha256 of the test's script and every other module loaded from its directory
+    (rational.py, reach.py, ...), so editing RESULT, BINOPS, BIT_BUDGET, ... changes it
+    """
+    file = getattr(sys.modules.get(test.__module__), "__file__", None)
+    if file is None: return None
+    folder = os.path.dirname(os.path.abspath(file))
+
+    paths = sorted({
+        os.path.abspath(module.__file__)
+        for module in list(sys.modules.values())
+        if getattr(module, "__file__", None) and os.path.dirname(os.path.abspath(module.__file__)) == folder
+    })
+    h = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+def run_of(test, digits, n_digits, ordered, fmt, solve_any, shard_size):
+    """Everything the lines of a checkpoint depend on, as stored in its first entry"""
+    run = {
+        "test": source_of(test),
+        "result": getattr(sys.modules.get(test.__module__), "RESULT", None),
+        "source": fingerprint(test),
+        "digits": [[d, s] for d, s in digits.items()],
+        "n_digits": n_digits,
+        "ordered": ordered,
+        "fmt": source_of(fmt),
+        "solve_any": source_of(solve_any) if solve_any else None,
+        "shard_size": shard_size,
+    }
+    return json.loads(json.dumps(run)) # as it reads back
+
+def read_checkpoint(path, run):
+    """
+    Shard index -> lines, for every shard recorded in the checkpoint file.
+    A checkpoint written for a different run (another driver, alphabet, RESULT, edited source, ...) is ignored.
+    """
+    done = {}
+    if not os.path.exists(path): return done
+
+    header = False # entries before the header (or without one) aren't trusted
+    with open(path) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue # partially written entry from a killed run
+
+            if "run" in entry:
+                if entry["run"] != run:
+                    changed = sorted(k for k in run.keys() | entry["run"].keys() if run.get(k) != entry["run"].get(k))
+                    print(f"{path} is from a different run ({', '.join(changed)} changed), starting over", file=sys.stderr)
+                    return {}
+                header = True
+            elif header:
+                done[entry["shard"]] = entry["lines"]
+    return done
+
+def write_checkpoint_entry(f, i, lines):
+    f.write(json.dumps({"shard": i, "lines": lines}))
+    f.write("\n")
+    f.flush()
+
+def write_table_parallel(
+    path, test, digits, n_digits, ordered=True, fmt=str, solve_any=None,
+    shard_size=500, workers=None, checkpoint=None, progress=None
+):
+    """
+    Same output as write_table, but solved on a process pool in shards of shard_size hands.
+
+    test, fmt and solve_any have to be picklable (i.e. module-level functions).
+    Finished shards go to checkpoint (default: path + ".<script>.ckpt"), which is deleted once the table is written.
+    The checkpoint starts with the run's parameters, and is only resumed by the same run.
+    progress (a Progress) is updated shard by shard; hands resumed from the checkpoint aren't timed.
+    If not ordered, the shards (and progress) are over the distinct multisets instead of every hand.
+    """
+    run = run_of(test, digits, n_digits, ordered, fmt, solve_any, shard_size)
+    if checkpoint is None:
+        script = run["test"].split(":")[0]
+        checkpoint = f"{path}.{os.path.splitext(script)[0]}.ckpt"
+
+    n_hands = len(digits) ** n_digits
+    # unordered, every multiset is solved once (on whichever worker gets it) and replayed for each ordering
+    keys = None if ordered else list(itertools.combinations_with_replacement(sorted(digits), n_digits))
+    n_items = n_hands if ordered else len(keys)
+    n_shards = -(-n_items // shard_size)
+
+    def shard(i):
+        start, stop = i * shard_size, min((i + 1) * shard_size, n_items)
+        if ordered:
+            return pool.submit(solve_shard, test, digits, n_digits, start, stop, True, fmt, None, progress is not None)
+        return pool.submit(solve_multisets, test, keys[start:stop], digits, fmt, solve_any, progress is not None)
+
+    done = read_checkpoint(checkpoint, run)
+    if progress: progress.start(n_items, sum(len(lines) for lines in done.values()))
+
+    with open(checkpoint, "w") as ckpt, ProcessPoolExecutor(workers) as pool:
+        # rewrite what's done, dropping anything a killed run left half-written
+        ckpt.write(json.dumps({"run": run}))
+        ckpt.write("\n")
+        for i, lines in done.items():
+            write_checkpoint_entry(ckpt, i, lines)
+
+        futures = {shard(i): i for i in range(n_shards) if i not in done}
+        for fut in as_completed(futures):
+            i = futures[fut]
+            if progress:
+                done[i], records = fut.result()
+                for record in records: progress.record(*record)
+                progress.flush()
+                progress.advance(len(records))
+            else:
+                done[i] = fut.result()
+            write_checkpoint_entry(ckpt, i, done[i])
+
+    shards = itertools.chain.from_iterable(done[i] for i in range(n_shards))
+    if ordered:
+        lines = shards
+    else:
+        solutions = dict(zip(keys, shards))
+        lines = (table_line(hand, solutions[canonical(hand)], digits) for hand in hands(digits, n_digits))
+
+    with open(path, "w") as f:
+        for line in lines:
+            f.write(line)
+            f.write("\n")
+
+    os.remove(checkpoint)
+    if progress: progress.finish()
@@ -5,10 +5,15 @@ System for calculating the optimal nuclear decay path for reactors in Omnifactor
 Have fun looking at it!
 """
 
-from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from fractions import Fraction
+from functools import cached_property
+import heapq
+import os
 from numbers import Rational
-from itertools import chain, product
+from itertools import islice, product
+from math import gcd, lcm
 
 inf = float('inf')
 def div(a, b):
@@ -23,6 +28,123 @@ class Item:
         qty = f"{float(self.qty):01.5f}"
         return f"{qty}x {self.name}"
 
+class Inventory:
+    """
+    Item quantities as a dense vector: every item name gets an index (shared by all
+    inventories), and item i's quantity is num[i] / den, with int numerators and one
+    shared denominator. Arithmetic is then int math with one gcd per operation
+    (instead of one per Fraction op), and stays exact: the denominator just grows
+    to fit whatever ratios calculate comes up with.
+    If a quantity isn't rational (like inf), den is None and num holds the quantities.
+    Indices past the end of num (items added after this inventory was made) are 0.
+    Iterating an inventory gives its non-zero Items, so it prints like a list[Item].
+    """
+    __slots__ = ("num", "den")
+
+    INDEX: "dict[str, int]" = {}
+    NAMES: "list[str]" = []
+
+    def __init__(self, qty=()):
+        qty = list(qty)
+        if all(isinstance(q, Rational) for q in qty):
+            den = lcm(1, *(q.denominator for q in qty))
+            self.num = [q.numerator * (den // q.denominator) for q in qty]
+            self.den = den
+        else:
+            self.num, self.den = qty, None
+
+    @classmethod
+    def scaled(cls, num: "list[int]", den: int) -> "Inventory":
+        """num / den, reduced"""
+        g = gcd(den, *num)
+        if g > 1:
+            num = [n // g for n in num]
+            den //= g
+
+        inv = object.__new__(cls)
+        inv.num, inv.den = num, den
+        return inv
+
+    @classmethod
+    def index(cls, name: str) -> int:
+        i = cls.INDEX.get(name)
+        if i is None:
+            i = cls.INDEX[name] = len(cls.NAMES)
+            cls.NAMES.append(name)
+        return i
+
+    @classmethod
+    def of(cls, items: "list[Item] | Inventory") -> "Inventory":
+        if isinstance(items, cls): return items
+
+        qty = []
+        for it in items:
+            i = cls.index(it.name)
+            if i >= len(qty): qty.extend([0] * (i + 1 - len(qty)))
+            qty[i] += it.qty
+        return cls(qty)
+
+    def __len__(self):
+        return len(self.num)
+
+    @property
+    def qty(self) -> "list[Rational]":
+        return [self.get(i) for i in range(len(self.num))]
+
+    def get(self, i: int) -> Rational:
+        if i >= len(self.num): return 0
+        if self.den is None: return self.num[i]
+        return Fraction(self.num[i], self.den)
+
+    def has(self, i: int) -> bool:
+        return i < len(self.num) and self.num[i] != 0
+
+    def __getitem__(self, name: str) -> Rational:
+        i = self.INDEX.get(name)
+        return 0 if i is None else self.get(i)
+
+    def __iter__(self):
+        for i, n in enumerate(self.num):
+            if n != 0: yield Item(self.NAMES[i], self.get(i))
+
+    def __repr__(self):
+        return f"Inventory({[*self]})"
+
+    def copy(self) -> "Inventory":
+        inv = object.__new__(Inventory)
+        inv.num, inv.den = self.num.copy(), self.den
+        return inv
+
+    def scale(self, n: Rational) -> "Inventory":
+        if self.den is None or not isinstance(n, Rational):
+            return Inventory([q * n for q in self.qty])
+        return Inventory.scaled([q * n.numerator for q in self.num], self.den * n.denominator)
+
+    def add(self, *others: "Inventory") -> "Inventory":
+        out = self
+        for other in others: out = out.add_scaled(other, 1)
+        return out
+
+    def add_scaled(self, other: "Inventory", n: Rational) -> "Inventory":
+        """self + other * n"""
+        if self.den is None or other.den is None or not isinstance(n, Rational):
+            qty = self.qty + [0] * (len(other) - len(self))
+            for i, q in enumerate(other.qty):
+                if q: qty[i] += q * n
+            return Inventory(qty)
+
+        # num/den + onum * a / (oden * b), over the lcm of both denominators
+        a, b = n.numerator, n.denominator
+        oden = other.den * b
+        den = lcm(self.den, oden)
+        m, om = den // self.den, a * (den // oden)
+
+        num = [q * m for q in self.num] if m != 1 else self.num.copy()
+        if len(other.num) > len(num): num.extend([0] * (len(other.num) - len(num)))
+        for i, q in enumerate(other.num):
+            if q: num[i] += q * om
+        return Inventory.scaled(num, den)
+
 @dataclass
 class Recipe:
     i: list[Item]
@@ -35,6 +157,10 @@ class Recipe:
     
     __rshift__ = __matmul__
 
+    def __reduce__(self):
+        # the class gets shadowed by the Recipe builder below, so it can't be pickled by name
+        return make_recipe, (self.i, self.o)
+
     def __str__(self):
         return f"{self.pretty_list(self.i)} -> {self.pretty_list(self.o)}"
 
@@ -49,34 +175,53 @@ class Recipe:
     
 
     @staticmethod
-    def item_qty(inputs: "list[Item]", item: str):
-        return sum(it.qty for it in inputs if it.name == item)
+    def item_qty(inputs: "list[Item] | Inventory", item: str):
+        return Inventory.of(inputs)[item]
 
     @staticmethod
-    def scale(inputs: "list[Item]", n: Rational):
-        return [Item(it.name, it.qty * n) for it in inputs]
+    def scale(inputs: "list[Item] | Inventory", n: Rational):
+        return Inventory.of(inputs).scale(n)
 
     @staticmethod
-    def add(*inputses: "tuple[list[Item]]"):
-        its = [*chain.from_iterable(inputses)]
-        return [*filter(lambda it: it.qty != 0, (Item(name, Recipe.item_qty(its, name)) for name in set(it.name for it in its)))]
+    def add(*inputses: "list[Item] | Inventory"):
+        first, *rest = (Inventory.of(inputs) for inputs in inputses)
+        return first.add(*rest)
+
+    @cached_property
+    def needs(self) -> "list[tuple[int, Rational]]":
+        """(inventory index, quantity) of every input"""
+        return [(Inventory.index(it.name), it.qty) for it in self.i]
+
+    @cached_property
+    def delta(self) -> Inventory:
+        """What one craft changes: outputs - inputs"""
+        return Inventory.of(self.o).add(Inventory.of(self.i).scale(-1))
 
-    def has_all_ingredients(self, inputs: "list[Item]") -> bool:
-        iset, rset = set(it.name for it in inputs), set(it.name for it in self.i)
-        return rset <= iset
+    def has_all_ingredients(self, inputs: "list[Item] | Inventory") -> bool:
+        inputs = Inventory.of(inputs)
+        return all(inputs.has(i) for i, _ in self.needs)
 
-    def calculate(self, inputs: "list[Item]") -> "list[Item]":
-        inputs = inputs.copy()
+    def calculate(self, inputs: "list[Item] | Inventory") -> Inventory:
+        inputs = Inventory.of(inputs)
 
-        if not self.has_all_ingredients(inputs): return inputs
+        if not self.has_all_ingredients(inputs): return inputs.copy()
 
-        n_outputs = min(div(self.item_qty(inputs, it.name), it.qty) for it in self.i)
-        return self.add(inputs, self.scale(self.i, -1 * n_outputs), self.scale(self.o, n_outputs))
+        if inputs.den is None:
+            n_outputs = min(div(inputs.get(i), qty) for i, qty in self.needs)
+        else:
+            n_outputs = min(
+                Fraction(inputs.num[i] * qty.denominator, inputs.den * qty.numerator)
+                for i, qty in self.needs
+            )
+        return inputs.add_scaled(self.delta, n_outputs)
 
 
 
 Recipe = Recipe(None, None)
 
+def make_recipe(i, o):
+    return Recipe @ i >> o
+
 # a while ago, 2021
 
 main_recipes = [
@@ -183,19 +328,282 @@ inventory = [
     # Item("U238", inf)
 ]
 
-def run_recipes(recipes, inv, MAX_ITERS=100, p=True):
-    iminv = inv.copy()
-    iterations = 0
-    while any(r.has_all_ingredients(iminv) for r in recipes) and iterations <= MAX_ITERS:
-        for r in recipes:
-            if r.has_all_ingredients(iminv):
-                #print(f"Crafted: {r}")
-                iminv = r.calculate(iminv)
-                iterations += 1
+def solve_linear(a: "list[list[Rational]]", b: "list[Rational]"):
+    """x with a x = b, by Gaussian elimination over Fractions, or None if a is singular"""
+    n = len(b)
+    m = [[Fraction(v) for v in row] + [Fraction(bv)] for row, bv in zip(a, b)]
+
+    for col in range(n):
+        pivot = next((r for r in range(col, n) if m[r][col] != 0), None)
+        if pivot is None: return None
+        m[col], m[pivot] = m[pivot], m[col]
+
+        prow = m[col]
+        for r in range(n):
+            if r != col and m[r][col] != 0:
+                f = m[r][col] / prow[col]
+                m[r] = [v - f * p if p else v for v, p in zip(m[r], prow)]
+
+    return [m[i][n] / m[i][i] for i in range(n)]
+
+def steady_state(recipes, inv, passes=1, max_trials=64):
+    """
+    The inventory run_recipes converges to, computed exactly, or None if it can't be.
+
+    Every recipe runs until one of its inputs (its limiting input) is used up,
+    so with x[r] = how many times recipe r is crafted in total, the final inventory
+    is inv + sum(x[r] * r.delta), and each recipe's limiting input ends at 0:
+    one equation per recipe, and one linear solve for all the x (for chains of
+    single-input recipes, that's the geometric series of the transfer matrix summed).
+
+    That only pins down the result if no item is an input of two recipes: otherwise
+    the split of that item between them depends on the crafting order, so this
+    gives up (None) and run_recipes crafts instead.
+
+    Which input is limiting isn't known up front, so choices are tried (ordered by
+    what's scarcest after a few passes of run_recipes), up to max_trials of them,
+    until one gives x >= 0 and a final inventory >= 0.
+    """
+    inv = Inventory.of(inv)
+    recipes = [*recipes]
+    if any(len(users) > 1 for users in input_index(recipes).values()): return None
+
+    guess = run_recipes(recipes, inv, MAX_ITERS=passes * len(recipes), p=False)
+
+    choices = [sorted(r.needs, key=lambda need: div(guess.get(need[0]), need[1])) for r in recipes]
+    for limits in islice(product(*choices), max_trials):
+        a = [[r.delta.get(j) for r in recipes] for j, _ in limits]
+        x = solve_linear(a, [-inv.get(j) for j, _ in limits])
+        if x is None or any(v < 0 for v in x): continue
+
+        out = inv
+        for r, v in zip(recipes, x):
+            if v: out = out.add_scaled(r.delta, v)
+        if all(q >= 0 for q in out.qty): return out
+
+    return None
+
+def run_recipes(recipes, inv, MAX_ITERS=100, p=True, exact=False):
+    """
+    Craft every recipe that has all its ingredients, as many times as it can, until none
+    have or MAX_ITERS crafts are done. exact solves for where that converges instead
+    (see steady_state), falling back to crafting if that doesn't work out.
+    """
+    iminv = steady_state(recipes, inv) if exact else None
+    if iminv is None: iminv = craft(recipes, inv, MAX_ITERS)
 
     if p: Recipe.pprint(iminv)
     return iminv
 
+def craft(recipes, inv, MAX_ITERS=100):
+    """
+    run_recipes' crafting loop: passes over recipes in order, crafting each one that
+    has all its ingredients, until none do or MAX_ITERS crafts are done (checked between passes).
+
+    Instead of checking every recipe on every pass, recipes are indexed by their inputs,
+    and only the ones using an item that a craft just changed get checked again.
+    A recipe that becomes craftable after its turn in a pass waits for the next one.
+    """
+    recipes = [*recipes]
+    iminv = Inventory.of(inv).copy()
+    users = input_index(recipes)
+    ready = ready_recipes(recipes, iminv)
+
+    iterations = 0
+    while ready and iterations <= MAX_ITERS:
+        iminv, fired = craft_pass(recipes, users, ready, iminv)
+        iterations += len(fired)
+
+    return iminv
+
+def input_index(recipes) -> "dict[int, list[int]]":
+    """inventory index -> positions of the recipes with it as an input"""
+    users = {}
+    for k, r in enumerate(recipes):
+        for i, _ in r.needs:
+            users.setdefault(i, []).append(k)
+    return users
+
+def ready_recipes(recipes, inv: Inventory) -> "set[int]":
+    return {k for k, r in enumerate(recipes) if r.has_all_ingredients(inv)}
+
+def craft_pass(recipes, users, ready: "set[int]", iminv: Inventory):
+    """One pass of craft (updating ready as it goes): the new inventory, and which recipes crafted"""
+    worklist = sorted(ready)
+    fired = []
+    while worklist:
+        k = heapq.heappop(worklist)
+        if fired and k <= fired[-1] or k not in ready: continue
+        fired.append(k)
+
+        r = recipes[k]
+        #print(f"Crafted: {r}")
+        iminv = r.calculate(iminv)
+
+        for i, q in enumerate(r.delta.num):
+            if not q: continue
+            for j in users.get(i, ()):
+                if recipes[j].has_all_ingredients(iminv):
+                    if j not in ready:
+                        ready.add(j)
+                        if j > k: heapq.heappush(worklist, j)
+                else:
+                    ready.discard(j)
+
+    return iminv, fired
+
+@dataclass
+class Convergence:
+    status: str = "max passes" # or "fixed point", "epsilon", "cycle"
+    passes: int = 0
+    iterations: int = 0 # crafts
+    residual: Rational = 0 # total quantity the last pass moved around
+    firing: "list[Recipe]" = field(default_factory=list) # recipes that crafted in the last pass
+    extrapolations: int = 0
+
+def aitken(x0: Inventory, x1: Inventory, x2: Inventory):
+    """
+    Aitken's delta-squared extrapolation of three successive inventories: the limit,
+    if every item that changed did so by the same ratio r (0 < r < 1) both times,
+    otherwise None. Single loops converge like that, so the jump lands exactly on the limit.
+    """
+    n = max(len(x0), len(x1), len(x2))
+    ratio = None
+    for i in range(n):
+        d1, d2 = x1.get(i) - x0.get(i), x2.get(i) - x1.get(i)
+        if d1 == 0 and d2 == 0: continue
+        if d1 == 0: return None
+
+        r = div(d2, d1)
+        if ratio is None: ratio = r
+        if r != ratio: return None
+
+    if ratio is None or not 0 < ratio < 1: return None
+
+    # c + d2 * (r + r^2 + ...) for every item
+    out = [x2.get(i) + (x2.get(i) - x1.get(i)) * ratio / (1 - ratio) for i in range(n)]
+    if any(v < 0 for v in out): return None
+    return Inventory(out)
+
+def converge(recipes, inv, eps: Rational = 0, max_passes=1000, extrapolate=True):
+    """
+    Craft in passes like run_recipes, but stop at a fixed point (nothing craftable),
+    once a pass moves at most eps in total (if eps > 0), or when an inventory repeats (a cycle).
+    With extrapolate, every 3 passes that look geometric get jumped ahead with aitken.
+    Returns the inventory and a Convergence.
+    """
+    recipes = [*recipes]
+    iminv = Inventory.of(inv).copy()
+    users = input_index(recipes)
+    ready = ready_recipes(recipes, iminv)
+
+    def state(inv):
+        qty = inv.qty
+        while qty and qty[-1] == 0: qty.pop()
+        return tuple(qty)
+
+    diag = Convergence()
+    seen = {state(iminv)}
+    history = [iminv]
+    while ready:
+        if diag.passes >= max_passes: break
+
+        prev = iminv
+        iminv, fired = craft_pass(recipes, users, ready, iminv)
+        diag.passes += 1
+        diag.iterations += len(fired)
+        diag.firing = [recipes[k] for k in fired]
+        diag.residual = sum(abs(iminv.get(i) - prev.get(i)) for i in range(max(len(iminv), len(prev))))
+
+        if 0 < eps and diag.residual <= eps:
+            diag.status = "epsilon"
+            break
+
+        key = state(iminv)
+        if key in seen:
+            diag.status = "cycle"
+            break
+        seen.add(key)
+
+        history.append(iminv)
+        if extrapolate and len(history) >= 3:
+            x = aitken(*history[-3:])
+            if x is not None:
+                iminv = x
+                ready = ready_recipes(recipes, iminv)
+                history = [iminv]
+                diag.extrapolations += 1
+    else:
+        diag.status = "fixed point"
+        diag.firing = []
+
+    return iminv, diag
+
+def sweep(base, groups, inv, final=(), metric="ESun", workers=None, split=None):
+    """
+    Run every configuration (base plus one recipe out of each group) to its steady state,
+    then through final. Returns [(choice of each group, final inventory as a list[Item])],
+    sorted by how much of metric it ends with, most first.
+
+    Each item is only used by one recipe in any configuration, so where things end up
+    doesn't depend on which recipes got to craft first. That means configurations
+    can share work: the steady state with the first k groups' choices is computed once,
+    and is where every configuration with those choices continues from.
+    That only holds for exact steady states: if a prefix has none (steady_state gives up),
+    the configurations below it are each run from inv, like run_recipes would on its own.
+    The subtrees below the first split groups are run on a process pool; by default,
+    split is the fewest groups that give every worker a subtree.
+    """
+    groups = [[*g] for g in groups]
+    if split is None:
+        split, n_prefixes = 0, 1
+        while split < len(groups) and n_prefixes < (workers or os.cpu_count() or 1):
+            n_prefixes *= len(groups[split])
+            split += 1
+
+    inv = Inventory.of(inv)
+    prefixes = [((), inv)]
+    for g in groups[:split]:
+        prefixes = [
+            ((*choice, j), continue_from(base, groups, (*choice, j), state))
+            for choice, state in prefixes
+            for j in range(len(g))
+        ]
+
+    with ProcessPoolExecutor(workers) as pool:
+        futures = [
+            pool.submit(sweep_from, base, groups, choice, [*inv], None if state is None else [*state], [*final])
+            for choice, state in prefixes
+        ]
+        results = [res for fut in futures for res in fut.result()]
+
+    return sorted(results, key=lambda res: -Inventory.of(res[1])[metric])
+
+def chosen(groups, choice):
+    return [g[j] for g, j in zip(groups, choice)]
+
+def continue_from(base, groups, choice, state):
+    """Steady state of base plus choice, from state (that of choice's prefix), or None if either has none"""
+    if state is None: return None
+    return steady_state([*base, *chosen(groups, choice)], state)
+
+def sweep_from(base, groups, choice, inv, items, final):
+    """
+    The configurations of sweep that start with choice, from the steady state items of that prefix
+    (None if it has none, and every configuration below it is run from inv instead)
+    """
+    state = None if items is None else Inventory.of(items)
+    if len(choice) == len(groups):
+        if state is None: state = run_recipes([*base, *chosen(groups, choice)], inv, p=False, exact=True)
+        return [(choice, [*run_recipes(final, state, p=False)])]
+
+    out = []
+    for j in range(len(groups[len(choice)])):
+        nxt = (*choice, j)
+        state_nxt = continue_from(base, groups, nxt, state)
+        out += sweep_from(base, groups, nxt, inv, None if state_nxt is None else [*state_nxt], final)
+    return out
+
 # print("LE* Recipes")
 # lei = run_recipes([*main_recipes, *low_recipes], inventory)
 # print()
@@ -450,22 +858,114 @@ r_bk = [
     Recipe @ [Item("Bk248", 4), Item("Bk247", 5)] >> [Item("HEB-248")]
 ]
 
-out = []
-for recipes in product(
-    enumerate(r_u), 
-    enumerate(r_np), 
-    enumerate(r_pu), 
-    enumerate(r_am), 
-    enumerate(r_cm), 
-    enumerate(r_bk)
-):
-    a, b = zip(*recipes)
-    # print(f'Set {"".join(str(n) for n in a)}')
-
-    out.append((a, run_recipes([*mrec, *b], inventory, p=False)))
-    # print()
-
-for a, b in out:
-    print(f'Set {"".join(str(n) for n in a)}')
-    run_recipes(sunnarium_recipes, b)
-    print()
\ No newline at end of file
+def simplex(c, a, b):
+    """
+    Maximise c x subject to a x <= b and x >= 0 (with b >= 0), exactly over Fractions.
+    Returns (value, x), raises ValueError if it's unbounded.
+    Pivots are picked by Bland's rule (lowest index), so degenerate pivots can't cycle.
+    """
+    m, n = len(a), len(c)
+    t = [
+        [Fraction(v) for v in row] + [Fraction(int(i == k)) for k in range(m)] + [Fraction(b[i])]
+        for i, row in enumerate(a)
+    ]
+    z = [Fraction(-v) for v in c] + [Fraction(0)] * (m + 1)
+    basis = [n + i for i in range(m)]
+
+    while True:
+        col = next((j for j in range(n + m) if z[j] < 0), None)
+        if col is None: break
+
+        row, best = None, None
+        for i in range(m):
+            if t[i][col] > 0:
+                ratio = t[i][-1] / t[i][col]
+                if row is None or ratio < best or (ratio == best and basis[i] < basis[row]):
+                    row, best = i, ratio
+        if row is None: raise ValueError("unbounded")
+
+        prow = t[row] = [v / t[row][col] for v in t[row]]
+        for i in range(m):
+            f = t[i][col]
+            if i != row and f != 0:
+                t[i] = [v - f * p if p else v for v, p in zip(t[i], prow)]
+        f = z[col]
+        z = [v - f * p if p else v for v, p in zip(z, prow)]
+        basis[row] = col
+
+    x = [Fraction(0)] * n
+    for i, j in enumerate(basis):
+        if j < n: x[j] = t[i][-1]
+    return z[-1], x
+
+def max_yield(recipes, inv, metric):
+    """
+    The most metric that crafting recipes (any number of times each, fractions included) can
+    end with, starting from inv, and how many times to craft each recipe for it.
+    """
+    inv = Inventory.of(inv)
+    target = Inventory.index(metric)
+    items = sorted({i for r in recipes for i, q in enumerate(r.delta.num) if q})
+
+    # no item can go negative: -(sum of x[r] * delta[r]) <= inv, unless there's an infinite supply of it
+    items = [i for i in items if inv.get(i) != inf]
+    a = [[-r.delta.get(i) for r in recipes] for i in items]
+    value, x = simplex([r.delta.get(target) for r in recipes], a, [inv.get(i) for i in items])
+    return inv.get(target) + value, x
+
+def optimize(base, groups, inv, final=(), metric="ESun"):
+    """
+    The configuration (base plus one recipe out of each group, then final) that can make
+    the most metric, by branch and bound instead of trying every configuration.
+
+    Each node is a linear program over how much to craft of every recipe (max_yield),
+    with only some of each group's recipes allowed. Its optimum bounds every configuration
+    below it. If it mixes recipes of a group, that group gets branched on, one child per
+    allowed recipe. Unlike run_recipes, recipes don't have to run until an input is used
+    up, so this is the best the configuration can do with the amounts chosen well.
+
+    Returns (yield, choice of each group, final inventory as a list[Item], [(recipe, crafts)]).
+    """
+    groups = [[*g] for g in groups]
+    best = None
+
+    stack = [[[*range(len(g))] for g in groups]]
+    while stack:
+        allowed = stack.pop()
+        options = [(k, j) for k, js in enumerate(allowed) for j in js]
+        recipes = [*base, *(groups[k][j] for k, j in options), *final]
+
+        value, x = max_yield(recipes, inv, metric)
+        if best is not None and value <= best[0]: continue
+
+        used = {}
+        for (k, j), v in zip(options, x[len(base):]):
+            if v: used.setdefault(k, []).append(j)
+
+        mixed = next((k for k in range(len(groups)) if len(used.get(k, ())) > 1), None)
+        if mixed is None:
+            choice = tuple(used.get(k, allowed[k])[0] for k in range(len(groups)))
+            out = Inventory.of(inv)
+            for r, v in zip(recipes, x):
+                if v: out = out.add_scaled(r.delta, v)
+            best = (value, choice, [*out], [(r, v) for r, v in zip(recipes, x) if v])
+            continue
+
+        for j in allowed[mixed]:
+            stack.append([[j] if k == mixed else js for k, js in enumerate(allowed)])
+
+    return best
+
+if __name__ == "__main__":
+    results = sweep(mrec, [r_u, r_np, r_pu, r_am, r_cm, r_bk], inventory, sunnarium_recipes, metric="ESun")
+    for a, b in results:
+        print(f'Set {"".join(str(n) for n in a)}')
+        Recipe.pprint(b)
+        print()
+
+    value, choice, items, crafts = optimize(mrec, [r_u, r_np, r_pu, r_am, r_cm, r_bk], inventory, sunnarium_recipes, metric="ESun")
+    print(f'Best mix: Set {"".join(str(n) for n in choice)}, {float(value):01.5f}x ESun')
+    for r, n in crafts:
+        print(f"{float(n):01.5f}x {r}")
+    print()
+    Recipe.pprint(items)